@@ -0,0 +1,303 @@
+import hashlib
+import os
+import threading
+from utils.metrics import get_logger
+from utils.model_router import ModelRouter, gemini_api_keys, model_spec
+
+logger = get_logger("backends")
+
+# Generation backends. agents/tutor_agent.py builds the prompts and caches,
+# coalesces and measures answers; a backend only turns a system prompt and a
+# conversation into text. Messages are dicts with a "role" ("user" or
+# "model") and either "text" or "image" bytes plus a "mime_type".
+#
+# The backend is chosen per deployment (LOCALLEARN_BACKEND) and can differ
+# for simplified answers (LOCALLEARN_SIMPLIFY_BACKEND), e.g. Gemini for
+# detailed explanations and a local model for "Make Even Simpler".
+GENERATION_BACKEND = os.getenv("LOCALLEARN_BACKEND", "gemini").lower()
+SIMPLIFY_BACKEND = os.getenv("LOCALLEARN_SIMPLIFY_BACKEND", GENERATION_BACKEND).lower()
+
+# Local CPU model (llama.cpp GGUF file, through llama-cpp-python)
+LOCAL_MODEL_PATH = os.path.expanduser(os.getenv("LOCALLEARN_LOCAL_MODEL", ""))
+LOCAL_CONTEXT = int(os.getenv("LOCALLEARN_LOCAL_CONTEXT", "4096"))
+LOCAL_THREADS = int(os.getenv("LOCALLEARN_LOCAL_THREADS", "0"))  # 0: llama.cpp picks
+LOCAL_MAX_TOKENS = int(os.getenv("LOCALLEARN_LOCAL_MAX_TOKENS", "512"))
+
+# A pool of API keys needs one client per key, which google-generativeai has
+# no public API for: GenerativeModel keeps its client in the private _client
+# attribute and only falls back to the genai.configure() client while that is
+# None. Checked against google-generativeai 0.8.x; with other releases only
+# the first key is used.
+KEY_POOL_SDK_VERSIONS = ("0.8.",)
+
+
+def _supports_key_pool(genai):
+    return getattr(genai, "__version__", "").startswith(KEY_POOL_SDK_VERSIONS)
+
+
+class GeminiBackend:
+    """Google Gemini, spread over API keys and models by utils/model_router.py."""
+
+    name = "gemini"
+    error_label = "Google AI API"
+
+    # The Gemini client is configured once per set of API keys and one ready
+    # model is kept per (route, system prompt), so the hot path does no
+    # per-request setup.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._configured_keys = None
+        self._router = None
+        self._key_clients = {}
+        self._models = {}
+
+    def reset(self):
+        """Drop the configured client, router and cached models (e.g. after changing keys)."""
+        with self._lock:
+            self._configured_keys = None
+            self._router = None
+            self._key_clients.clear()
+            self._models.clear()
+
+    def _configure(self):
+        """Validate the API keys and configure the Google AI client if the keys changed."""
+        # Check for Google AI API keys (GOOGLE_API_KEYS for a pool, else GOOGLE_API_KEY)
+        api_keys = gemini_api_keys()
+        if api_keys and api_keys == self._configured_keys:
+            return
+
+        if not api_keys:
+            raise Exception("GOOGLE_API_KEY environment variable not set. Please set your Google AI API key in a .env file.")
+
+        # Validate API key format (should start with 'AIza')
+        for api_key in api_keys:
+            if not api_key.startswith('AIza'):
+                raise Exception(f"Invalid API key format. Google AI API keys should start with 'AIza'. Your key starts with: {api_key[:10]}...")
+
+        # The SDK is imported on first use so that app start-up does not pay for it
+        import google.generativeai as genai
+
+        # Configure the Google AI client once per set of keys (the first key is the
+        # SDK default); models and route statistics for the old keys are discarded
+        genai.configure(api_key=api_keys[0])
+        key_count = len(api_keys)
+        if key_count > 1 and not _supports_key_pool(genai):
+            logger.warning("key_pool_unsupported", sdk=getattr(genai, "__version__", "unknown"),
+                           checked="0.8.x", keys=key_count)
+            key_count = 1
+        self._models.clear()
+        self._key_clients.clear()
+        self._configured_keys = api_keys
+        self._router = ModelRouter(key_count)
+
+    @property
+    def router(self):
+        """The model router for the configured API keys."""
+        with self._lock:
+            self._configure()
+            return self._router
+
+    def model_id(self, mode):
+        """Identifies the models behind answers for mode; part of explanation cache keys."""
+        return model_spec(mode)
+
+    def _key_client(self, key_index):
+        """Generation client for an extra API key (call with the lock held)."""
+        client = self._key_clients.get(key_index)
+        if client is None:
+            from google.ai import generativelanguage as glm
+
+            client = glm.GenerativeServiceClient(client_options={"api_key": self._configured_keys[key_index]})
+            self._key_clients[key_index] = client
+        return client
+
+    def _model(self, route, system_prompt):
+        """Return a ready model for a route and system prompt."""
+        key = (route.key_index, route.model, system_prompt)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+        with self._lock:
+            self._configure()
+            model = self._models.get(key)
+            if model is None:
+                import google.generativeai as genai
+
+                # Create the model with Google ADK-style agent prompting
+                model = genai.GenerativeModel(model_name=route.model, system_instruction=system_prompt)
+                if route.key_index:
+                    # genai.configure sets one process-wide key; models for the
+                    # other keys in the pool get a client of their own (see
+                    # KEY_POOL_SDK_VERSIONS for the SDK releases this was checked on)
+                    model._client = self._key_client(route.key_index)
+                self._models[key] = model
+        return model
+
+    @staticmethod
+    def _contents(messages):
+        """Messages in the SDK's format; a single text turn is sent as a plain prompt."""
+        if len(messages) == 1 and "text" in messages[0]:
+            return messages[0]["text"]
+        return [
+            {"role": message["role"],
+             "parts": [message["text"] if "text" in message
+                       else {"mime_type": message["mime_type"], "data": message["image"]}]}
+            for message in messages
+        ]
+
+    def generate(self, system_prompt, messages, mode="detailed"):
+        """Return the whole answer, or None if Gemini gave no text."""
+        contents = self._contents(messages)
+        # Routed to the fastest healthy key/model; rate limited, retried with
+        # backoff and circuit-broken per key
+        response, route = self.router.call(
+            mode, lambda route: self._model(route, system_prompt).generate_content(contents))
+        if response and hasattr(response, 'text') and response.text:
+            return response.text
+        return None
+
+    def stream(self, system_prompt, messages, mode="detailed"):
+        """Yield the answer in pieces as Gemini produces them."""
+        contents = self._contents(messages)
+        router = self.router
+        response, route = router.call(
+            mode, lambda route: self._model(route, system_prompt).generate_content(contents, stream=True),
+            kind="stream")
+        try:
+            for chunk in response:
+                # Chunks without text (e.g. safety metadata) raise on .text
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue
+                if text:
+                    yield text
+        except Exception as e:
+            router.record_failure(route, e)
+            raise
+
+
+class LlamaCppBackend:
+    """
+    A local GGUF model on the CPU through llama-cpp-python; no network needed.
+
+    The model is loaded on first use and shared by all sessions. llama.cpp
+    contexts are not thread-safe, so generations run one at a time.
+    """
+
+    name = "llamacpp"
+    error_label = "Local model"
+
+    def __init__(self, model_path=LOCAL_MODEL_PATH, n_ctx=LOCAL_CONTEXT, n_threads=LOCAL_THREADS,
+                 max_tokens=LOCAL_MAX_TOKENS):
+        self.model_path = model_path
+        self.n_ctx = n_ctx
+        self.n_threads = n_threads
+        self.max_tokens = max_tokens
+        self._llama = None
+        self._load_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._load_lock:
+            if self._llama is None:
+                if not self.model_path:
+                    raise Exception("LOCALLEARN_LOCAL_MODEL is not set to a GGUF model file")
+                try:
+                    from llama_cpp import Llama
+                except ImportError:
+                    raise Exception("The local backend needs the llama-cpp-python package")
+                logger.info("local_model_loading", path=self.model_path)
+                self._llama = Llama(model_path=self.model_path, n_ctx=self.n_ctx,
+                                    n_threads=self.n_threads or None, verbose=False)
+        return self._llama
+
+    def model_id(self, mode):
+        return f"llama.cpp:{os.path.basename(self.model_path)}"
+
+    def _chat(self, system_prompt, messages):
+        if any("text" not in message for message in messages):
+            raise Exception("The local model cannot read images")
+        return [{"role": "system", "content": system_prompt}] + [
+            {"role": "assistant" if message["role"] == "model" else "user", "content": message["text"]}
+            for message in messages
+        ]
+
+    def generate(self, system_prompt, messages, mode="detailed"):
+        return "".join(self.stream(system_prompt, messages, mode)) or None
+
+    def stream(self, system_prompt, messages, mode="detailed"):
+        llama = self._load()
+        chat = self._chat(system_prompt, messages)
+        with self._lock:
+            for chunk in llama.create_chat_completion(messages=chat, max_tokens=self.max_tokens, stream=True):
+                text = chunk["choices"][0]["delta"].get("content")
+                if text:
+                    yield text
+
+
+class DeterministicBackend:
+    """
+    Canned answers derived from the prompt: no model, no network, same input
+    always gives the same text. For tests, demos and benchmarks of everything
+    around generation.
+    """
+
+    name = "stub"
+    error_label = "Stub backend"
+
+    SENTENCES = (
+        "Think of it like something you see every day on the way to school.",
+        "When one thing changes, another thing changes because of it.",
+        "You can try this at home with things from the kitchen.",
+        "Teachers explain it with a simple picture on the blackboard.",
+        "Once you notice it, you will see it everywhere around you.",
+    )
+
+    def model_id(self, mode):
+        return "stub"
+
+    def _answer(self, system_prompt, messages):
+        topic = next((m["text"] for m in messages if m["role"] == "user" and "text" in m), "this topic")
+        topic = topic.splitlines()[0].strip()
+        digest = hashlib.sha256(repr((system_prompt, messages)).encode("utf-8")).digest()
+        # Follow-ups and simple answers get fewer sentences than a full explanation
+        count = 3 if len(messages) > 1 or "SIMPLE explanations" in system_prompt else 5
+        sentences = [self.SENTENCES[(digest[0] + i) % len(self.SENTENCES)] for i in range(count)]
+        return " ".join([f"{topic}:"] + sentences)
+
+    def generate(self, system_prompt, messages, mode="detailed"):
+        return self._answer(system_prompt, messages)
+
+    def stream(self, system_prompt, messages, mode="detailed"):
+        words = self._answer(system_prompt, messages).split(" ")
+        yield words[0]
+        for word in words[1:]:
+            yield " " + word
+
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "llamacpp": LlamaCppBackend,
+    "stub": DeterministicBackend,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_backend(name=GENERATION_BACKEND):
+    """Return the shared backend registered under name; unknown names fall back to Gemini."""
+    if name not in BACKENDS:
+        logger.warning("unknown_backend", name=name, choices=", ".join(BACKENDS))
+        name = "gemini"
+    with _instances_lock:
+        backend = _instances.get(name)
+        if backend is None:
+            backend = _instances[name] = BACKENDS[name]()
+    return backend
+
+
+def backend_for(simplify=False):
+    """The backend configured for detailed or simplified answers."""
+    return get_backend(SIMPLIFY_BACKEND if simplify else GENERATION_BACKEND)
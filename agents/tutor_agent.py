@@ -1,6 +1,36 @@
 # from google.adk.agents import Agent
-import google.generativeai as genai
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from agents.backends import backend_for, get_backend
+from utils.access_log import access_log
+from utils.explanation_cache import explanation_cache, make_cache_key, make_follow_up_key
+from utils.metrics import get_logger, increment, observe, timed
+from utils.single_flight import ABANDONED, tutor_flight
+from utils.topic_index import canonicalize_topic, topic_index
+
+logger = get_logger("tutor")
+
+# Default number of in-flight Gemini requests for ask_tutor_batch
+BATCH_MAX_CONCURRENCY = int(os.getenv("LOCALLEARN_BATCH_CONCURRENCY", "8"))
+
+# Follow-up requests on an explanation, sent as the next turn of its conversation
+FOLLOW_UP_PROMPTS = {
+    "simpler": ("Explain that again even more simply for a young student: at most 5-6 short "
+                "sentences, only everyday words, one main idea and one example from daily life. "
+                "Same language and friendly local style."),
+    "example": ("Give one more real-life example of this from the student's daily life, "
+                "different from the examples so far, in 3-4 sentences. "
+                "Same language and friendly local style."),
+}
+
+# Follow-up exchanges kept after the opening explanation when continuing a conversation
+FOLLOW_UP_MAX_TURNS = int(os.getenv("LOCALLEARN_FOLLOW_UP_TURNS", "4"))
+
+# Instruction for reading the topic off an uploaded textbook photo
+IMAGE_TOPIC_PROMPT = """You read photos of school textbook pages.
+Reply with only the name of the main science topic on the page, in English, in at most eight words.
+If the page has no readable topic, reply with NONE."""
 
 # Regional contexts for dialect-aware explanations
 REGIONAL_CONTEXTS = {
@@ -17,27 +47,22 @@ REGIONAL_CONTEXTS = {
     "English": "daily life in India, cricket, local transport, festivals",
 }
 
-def ask_tutor(topic, language="Kannada", simplify=False, extracted_from_image=False):
+def build_system_prompt(language, simplify=False):
     """
-    Generate explanation for a topic using a 3-agent system with dialect-aware prompts.
-    
+    Build the dialect-aware system prompt for a language and mode.
+
     Args:
-        topic: The topic to explain
         language: Target language for explanation
-        simplify: If True, generates ultra-simple explanation
-        extracted_from_image: If True, topic was extracted from image
-    
+        simplify: If True, builds the ultra-simple prompt
+
     Returns:
-        Dialect-aware explanation with regional examples
+        System prompt string
     """
-    try:
-        # Get regional context for the language
-        regional_context = REGIONAL_CONTEXTS.get(language, "daily life, cricket, local transport")
-        
-        # ---- Single Comprehensive Agent ----
-        # Handles the entire multi-step process: understand → explain → refine
-        if simplify:
-            system_prompt = f"""You are LocalLearn's expert AI tutor. Your task is to explain science topics in local languages with regional dialect and examples.
+    # Get regional context for the language
+    regional_context = REGIONAL_CONTEXTS.get(language, "daily life, cricket, local transport")
+
+    if simplify:
+        system_prompt = f"""You are LocalLearn's expert AI tutor. Your task is to explain science topics in local languages with regional dialect and examples.
 
 TOPIC TO EXPLAIN: The user will provide a topic to explain.
 TARGET LANGUAGE: {language}
@@ -55,8 +80,8 @@ IMPORTANT GUIDELINES for SIMPLE explanations:
 - Make it feel like a friendly teacher explaining to a neighbor's child
 
 Process: Understand the topic → Create simple explanation → Output final result."""
-        else:
-            system_prompt = f"""You are LocalLearn's expert AI tutor. Your task is to explain science topics in local languages with regional dialect and examples.
+    else:
+        system_prompt = f"""You are LocalLearn's expert AI tutor. Your task is to explain science topics in local languages with regional dialect and examples.
 
 TOPIC TO EXPLAIN: The user will provide a topic to explain.
 TARGET LANGUAGE: {language}
@@ -75,44 +100,340 @@ IMPORTANT GUIDELINES for DETAILED explanations:
 
 Process: Understand the topic → Create detailed explanation with examples → Refine for clarity → Output final result."""
 
-        # Check for Google AI API key
-        api_key = os.getenv('GOOGLE_API_KEY')
-        if not api_key:
-            raise Exception("GOOGLE_API_KEY environment variable not set. Please set your Google AI API key in a .env file.")
+    return system_prompt
+
 
-        # Validate API key format (should start with 'AIza')
-        if not api_key.startswith('AIza'):
-            raise Exception(f"Invalid API key format. Google AI API keys should start with 'AIza'. Your key starts with: {api_key[:10]}...")
+# ---- Prompt registry ----
+# System prompts are built once per (language, simplify) pair. Generation
+# itself is done by the backend chosen in agents/backends.py.
+_system_prompts = {}
 
-        # Use Google ADK agent structure with direct Google Generative AI calls
-        # This gives us Google ADK functionality while avoiding complex auth issues
 
-        # Configure the Google AI client (same as before)
-        genai.configure(api_key=api_key)
+def invalidate_models():
+    """
+    Drop cached prompts and the Gemini client, router and models.
 
-        # Create the model with Google ADK-style agent prompting
-        model = genai.GenerativeModel(
-            model_name="gemini-2.5-flash",
-            system_instruction=system_prompt
+    Call this after changing the API keys at runtime; everything is rebuilt
+    lazily on the next request.
+    """
+    _system_prompts.clear()
+    get_backend("gemini").reset()
+
+
+def get_system_prompt(language, simplify=False):
+    """Return the system prompt for a language and mode, building it on first use."""
+    key = (language, bool(simplify))
+    prompt = _system_prompts.get(key)
+    if prompt is None:
+        prompt = build_system_prompt(language, simplify)
+        if language in REGIONAL_CONTEXTS:
+            _system_prompts[key] = prompt
+    return prompt
+
+
+def extract_topic_from_image(image_bytes, mime_type="image/jpeg"):
+    """
+    Read the main topic off a textbook photo with multimodal Gemini.
+
+    Returns:
+        The topic, or None if Gemini found no readable topic
+    """
+    try:
+        topic = get_backend("gemini").generate(
+            IMAGE_TOPIC_PROMPT, [{"role": "user", "image": image_bytes, "mime_type": mime_type}], mode="image")
+    except Exception as api_error:
+        increment("errors_total", component="gemini", kind=type(api_error).__name__)
+        raise Exception(f"Google AI API error: {api_error}")
+
+    topic = (topic or "").strip().strip('."\'')
+    if not topic or topic.upper() == "NONE":
+        return None
+    return topic
+
+
+def build_user_prompt(topic, extracted_from_image=False):
+    """The user turn sent to Gemini for a topic."""
+    if extracted_from_image:
+        # Topics read from photos can carry recognition errors
+        return (f"{topic}\n\n(This topic was read from a photo of a textbook page and may "
+                "contain recognition errors. Explain the science topic it most likely refers to.)")
+    return topic
+
+
+def ask_tutor(topic, language="Kannada", simplify=False, extracted_from_image=False):
+    """
+    Generate explanation for a topic using a 3-agent system with dialect-aware prompts.
+    
+    Args:
+        topic: The topic to explain
+        language: Target language for explanation
+        simplify: If True, generates ultra-simple explanation
+        extracted_from_image: If True, topic was extracted from image
+    
+    Returns:
+        Dialect-aware explanation with regional examples
+    """
+    try:
+        # ---- Single Comprehensive Agent ----
+        # Handles the entire multi-step process: understand → explain → refine
+        with timed("prompt_build"):
+            system_prompt = get_system_prompt(language, simplify)
+
+        # Near-duplicate spellings of an answered topic share its cache entry
+        topic_key = topic_index.resolve(topic, language)
+        access_log.record_explanation(topic, topic_key, language, simplify)
+
+        # Serve repeated requests from the explanation cache
+        backend = backend_for(simplify)
+        mode = "simplify" if simplify else "detailed"
+        cache_key = make_cache_key(topic_key, language, simplify, backend.model_id(mode), system_prompt)
+        cached = explanation_cache.get(cache_key)
+        if cached:
+            return cached
+
+        # Identical concurrent requests share one generation
+        messages = [{"role": "user", "text": build_user_prompt(topic, extracted_from_image)}]
+        return tutor_flight.do(cache_key, lambda: _generate(
+            backend, system_prompt, messages, mode, language, cache_key, topic_key))
+
+    except Exception as e:
+        error_msg = f"Error generating explanation: {str(e)}"
+        raise Exception(error_msg)
+
+
+def _generate(backend, system_prompt, messages, mode, language, cache_key, topic_key):
+    """Generate one explanation with backend and cache a successful answer."""
+    try:
+        with timed(backend.name, mode="blocking"):
+            text = backend.generate(system_prompt, messages, mode)
+    except Exception as api_error:
+        logger.warning("generation_failed", backend=backend.name, language=language, error=str(api_error))
+        increment("errors_total", component=backend.name, kind=type(api_error).__name__)
+        raise Exception(f"{backend.error_label} error: {api_error}")
+
+    # Extract the text from the response
+    if text:
+        explanation = text.strip()
+    else:
+        explanation = "No explanation generated. Please try again."
+
+    if not explanation or explanation.strip() == "":
+        return f"Sorry, I couldn't generate an explanation. Please try again."
+
+    if text:
+        explanation_cache.put(cache_key, explanation)
+        topic_index.add(topic_key, language)
+
+    return explanation
+
+
+def ask_tutor_stream(topic, language="Kannada", simplify=False, extracted_from_image=False):
+    """
+    Stream an explanation for a topic chunk by chunk.
+
+    Same arguments as ask_tutor. Cached explanations are yielded as a single
+    chunk; otherwise text is yielded as Gemini produces it and the complete
+    explanation is cached once the stream finishes.
+
+    Yields:
+        Pieces of the explanation text, in order
+    """
+    try:
+        with timed("prompt_build"):
+            system_prompt = get_system_prompt(language, simplify)
+
+        topic_key = topic_index.resolve(topic, language)
+        access_log.record_explanation(topic, topic_key, language, simplify)
+        backend = backend_for(simplify)
+        mode = "simplify" if simplify else "detailed"
+        cache_key = make_cache_key(topic_key, language, simplify, backend.model_id(mode), system_prompt)
+        messages = [{"role": "user", "text": build_user_prompt(topic, extracted_from_image)}]
+        yield from _stream_generation(
+            cache_key, language, backend, system_prompt, messages, mode,
+            on_success=lambda explanation: topic_index.add(topic_key, language),
         )
 
-        # Generate the explanation using direct API call
+    except Exception as e:
+        error_msg = f"Error generating explanation: {str(e)}"
+        raise Exception(error_msg)
+
+
+def _stream_generation(cache_key, language, backend, system_prompt, messages, mode, on_success=None):
+    """
+    Yield a cached answer, or stream a new one from backend and cache it.
+
+    on_success(text) runs once a complete answer has been cached.
+    """
+    while True:
+        cached = explanation_cache.get(cache_key)
+        if cached:
+            yield cached
+            return
+
+        # If the same explanation is already being generated, wait for it
+        # and yield it whole instead of opening a second stream
+        future, leader = tutor_flight.join(cache_key)
+        if leader:
+            break
+        result = tutor_flight.wait(future)
+        if result is not ABANDONED:
+            yield result
+            return
+        # The leading stream's reader went away: try again, possibly as leader
+
+    explanation = None
+    error = None
+    try:
+        started = time.perf_counter()
+        parts = []
         try:
-            response = model.generate_content(topic)
+            for text in backend.stream(system_prompt, messages, mode):
+                if not parts:
+                    text = text.lstrip()
+                    observe("stage_seconds", time.perf_counter() - started, stage=f"{backend.name}_ttft")
+                parts.append(text)
+                yield text
         except Exception as api_error:
-            raise Exception(f"Google AI API error: {api_error}")
+            logger.warning("generation_stream_failed", backend=backend.name, language=language,
+                           error=str(api_error))
+            increment("errors_total", component=backend.name, kind=type(api_error).__name__)
+            raise Exception(f"{backend.error_label} error: {api_error}")
+        # Includes time the consumer spent between chunks
+        observe("stage_seconds", time.perf_counter() - started, stage=backend.name, mode="stream")
+
+        explanation = "".join(parts).strip()
+        if not explanation:
+            explanation = "Sorry, I couldn't generate an explanation. Please try again."
+            yield explanation
+            return
 
-        # Extract the text from the response
-        if response and hasattr(response, 'text') and response.text:
-            explanation = response.text.strip()
+        explanation_cache.put(cache_key, explanation)
+        if on_success:
+            on_success(explanation)
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        if error is None and explanation is None:
+            # The consumer stopped reading before the stream ended (e.g. the
+            # student clicked another button); not an upstream error
+            tutor_flight.abandon(cache_key, future)
         else:
-            explanation = "No explanation generated. Please try again."
-        
-        if not explanation or explanation.strip() == "":
-            return f"Sorry, I couldn't generate an explanation. Please try again."
-        
-        return explanation
-        
+            tutor_flight.finish(cache_key, future, result=explanation, error=error)
+
+
+# ---- Follow-up turns ----
+# "Make Even Simpler" and "Another Example" continue the conversation that
+# produced the explanation instead of starting over from the topic: the model
+# sees its own answer and only has to rework it. Follow-ups keep the system
+# prompt of the opening explanation, so requests share an identical prefix
+# (system prompt, topic, explanation) that Gemini's implicit context caching
+# can serve at a discount. "Another Example" runs on the explanation's models
+# and shares that prefix with it; "Make Even Simpler" runs on the lighter
+# simplify models (LOCALLEARN_GEMINI_SIMPLIFY_MODELS), trading the discount on
+# the opening explanation's prefix for a faster, cheaper model. Implicit
+# caching is per model, so repeated "simpler" turns still share their prefix.
+def start_conversation(topic, explanation, extracted_from_image=False):
+    """The conversation for a new explanation: the topic and the answer to it."""
+    return [
+        {"role": "user", "text": build_user_prompt(topic, extracted_from_image)},
+        {"role": "model", "text": explanation},
+    ]
+
+
+def extend_conversation(conversation, kind, answer):
+    """The conversation after a follow-up of the given kind was answered."""
+    return list(conversation) + [
+        {"role": "user", "text": FOLLOW_UP_PROMPTS[kind]},
+        {"role": "model", "text": answer},
+    ]
+
+
+def _recent_turns(conversation, max_follow_ups=FOLLOW_UP_MAX_TURNS):
+    """The opening exchange plus the last max_follow_ups follow-up exchanges."""
+    if len(conversation) <= 2 + 2 * max_follow_ups:
+        return list(conversation)
+    return list(conversation[:2]) + list(conversation[-2 * max_follow_ups:])
+
+
+def conversation_topic(conversation):
+    """The topic a conversation from start_conversation opened with."""
+    if not conversation:
+        return None
+    # build_user_prompt appends a note after a blank line for photo topics
+    return conversation[0]["text"].split("\n\n", 1)[0].strip() or None
+
+
+def record_follow_up(conversation, language, kind):
+    """Log a follow-up request as a follow-up on the conversation's topic."""
+    topic = conversation_topic(conversation)
+    if not topic:
+        return
+    topic_key, score = topic_index.lookup(topic, language)
+    access_log.record_explanation(topic, topic_key or canonicalize_topic(topic) or topic, language,
+                                  kind == "simpler", follow_up=kind)
+
+
+def ask_follow_up_stream(conversation, language="Kannada", kind="simpler"):
+    """
+    Stream a follow-up turn on an explanation the student already has.
+
+    Args:
+        conversation: Turns from start_conversation / extend_conversation
+        language: Language of the conversation
+        kind: "simpler" or "example" (see FOLLOW_UP_PROMPTS)
+
+    Yields:
+        Pieces of the answer text, in order
+    """
+    if kind not in FOLLOW_UP_PROMPTS:
+        raise ValueError(f"Unknown follow-up: {kind}")
+    try:
+        record_follow_up(conversation, language, kind)
+        system_prompt = get_system_prompt(language)
+        history = _recent_turns(conversation)
+        # "simpler" runs on the simplified-answer backend and models
+        simplify = kind == "simpler"
+        backend = backend_for(simplify)
+        mode = "simplify" if simplify else "detailed"
+        cache_key = make_follow_up_key(history, kind, language, backend.model_id(mode), system_prompt)
+        messages = history + [{"role": "user", "text": FOLLOW_UP_PROMPTS[kind]}]
+        yield from _stream_generation(cache_key, language, backend, system_prompt, messages, mode)
+
     except Exception as e:
         error_msg = f"Error generating explanation: {str(e)}"
         raise Exception(error_msg)
+
+
+def ask_follow_up(conversation, language="Kannada", kind="simpler"):
+    """Blocking version of ask_follow_up_stream; returns the whole answer."""
+    return "".join(ask_follow_up_stream(conversation, language, kind)).strip()
+
+
+def ask_tutor_batch(items, max_concurrency=BATCH_MAX_CONCURRENCY):
+    """
+    Generate explanations for many (topic, language, simplify) items concurrently.
+
+    Args:
+        items: Iterable of (topic, language, simplify) tuples; simplify may be omitted
+        max_concurrency: Maximum number of requests in flight at once
+
+    Returns:
+        List of (explanation, error) tuples in the same order as items. Exactly
+        one of the two is None for each item.
+    """
+    items = [tuple(item) for item in items]
+    if not items:
+        return []
+
+    def run(item):
+        topic, language = item[0], item[1]
+        simplify = item[2] if len(item) > 2 else False
+        try:
+            return ask_tutor(topic, language, simplify=simplify), None
+        except Exception as e:
+            return None, e
+
+    workers = max(1, min(max_concurrency, len(items)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tutor-batch") as pool:
+        return list(pool.map(run, items))
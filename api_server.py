@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Headless HTTP API for the tutor and TTS, independent of the Streamlit UI.
+
+    uvicorn api_server:app --host 0.0.0.0 --port 8000 --workers 4
+    python api_server.py --port 8000
+
+Endpoints:
+    POST /explain          {"topic", "language", "simplify", "extracted_from_image"} -> JSON
+    POST /explain/stream   same body -> explanation text streamed as it is generated
+    POST /follow-up/stream {"conversation", "language", "kind"} -> "simpler"/"example" turn, streamed
+    POST /speak            {"text", "language"} -> {"audio_id", "format", "url"}
+    GET  /audio/{audio_id} audio bytes (content-addressed, cacheable forever)
+    GET  /health, GET /metrics
+
+Several workers can run behind a load balancer: explanations and audio are
+shared through the SQLite and on-disk caches, and main.py becomes a thin
+client when LOCALLEARN_API_URL points at the service.
+"""
+
+import argparse
+import os
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from typing import List
+from agents.backends import backend_for
+from agents.tutor_agent import FOLLOW_UP_PROMPTS, ask_follow_up_stream, ask_tutor, ask_tutor_stream
+from utils.artifact_store import start_reaper
+from utils.audio_cache import audio_cache, audio_cache_key
+from utils.audio_utils import LANG_CODES, audio_format, prepare_tts_text, speak_text
+from utils.content_pack import open_pack
+from utils.metrics import export_prometheus, get_logger
+from utils.rate_limit import is_rate_limit_error
+
+load_dotenv()
+
+logger = get_logger("api")
+
+content_pack = open_pack(os.getenv("LOCALLEARN_PACK"))
+
+# Deletes orphaned TTS temp files (the API holds no sessions)
+start_reaper()
+
+app = FastAPI(title="LocalLearn API")
+
+
+class ExplainRequest(BaseModel):
+    topic: str
+    language: str = "Hindi"
+    simplify: bool = False
+    extracted_from_image: bool = False
+
+
+class Turn(BaseModel):
+    role: str
+    text: str
+
+
+class FollowUpRequest(BaseModel):
+    conversation: List[Turn]
+    language: str = "Hindi"
+    kind: str = "simpler"
+
+
+class SpeakRequest(BaseModel):
+    text: str
+    language: str = "Hindi"
+
+
+def _upstream_error(error):
+    """Map a tutor/TTS failure onto an HTTP error."""
+    status = 429 if is_rate_limit_error(error) else 502
+    return HTTPException(status_code=status, detail=str(error))
+
+
+def _validate(topic_or_text, language):
+    if not topic_or_text.strip():
+        raise HTTPException(status_code=422, detail="Text must not be empty")
+    if language not in LANG_CODES:
+        raise HTTPException(status_code=422, detail=f"Unsupported language: {language}")
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return export_prometheus()
+
+
+@app.post("/explain")
+async def explain(request: ExplainRequest):
+    _validate(request.topic, request.language)
+    if content_pack:
+        packed = content_pack.get_explanation(request.topic, request.language, request.simplify)
+        if packed:
+            return {"explanation": packed, "source": "pack"}
+    # Gemini calls block; keep them off the event loop
+    try:
+        explanation = await run_in_threadpool(
+            ask_tutor, request.topic, request.language,
+            simplify=request.simplify, extracted_from_image=request.extracted_from_image,
+        )
+    except Exception as e:
+        raise _upstream_error(e)
+    return {"explanation": explanation, "source": backend_for(request.simplify).name}
+
+
+@app.post("/explain/stream")
+def explain_stream(request: ExplainRequest):
+    _validate(request.topic, request.language)
+    if content_pack:
+        packed = content_pack.get_explanation(request.topic, request.language, request.simplify)
+        if packed:
+            return PlainTextResponse(packed)
+
+    chunks = ask_tutor_stream(request.topic, request.language, simplify=request.simplify,
+                              extracted_from_image=request.extracted_from_image)
+    return _stream_response(chunks, request.topic)
+
+
+@app.post("/follow-up/stream")
+def follow_up_stream(request: FollowUpRequest):
+    if request.kind not in FOLLOW_UP_PROMPTS:
+        raise HTTPException(status_code=422, detail=f"Unknown follow-up: {request.kind}")
+    if len(request.conversation) < 2 or any(turn.role not in ("user", "model") for turn in request.conversation):
+        raise HTTPException(status_code=422, detail="Conversation must start with a topic and its explanation")
+    _validate(request.conversation[0].text, request.language)
+
+    conversation = [{"role": turn.role, "text": turn.text} for turn in request.conversation]
+    chunks = ask_follow_up_stream(conversation, request.language, request.kind)
+    return _stream_response(chunks, conversation[0]["text"])
+
+
+def _stream_response(chunks, topic):
+    # Fail with a proper status if nothing could be generated at all;
+    # errors after the first chunk end the response early
+    try:
+        first = next(chunks, "")
+    except Exception as e:
+        raise _upstream_error(e)
+
+    def body():
+        yield first
+        try:
+            yield from chunks
+        except Exception as e:
+            logger.warning("explain_stream_failed", topic=topic[:60], error=str(e))
+            raise
+
+    # Starlette iterates synchronous generators in its thread pool
+    return StreamingResponse(body(), media_type="text/plain; charset=utf-8")
+
+
+@app.post("/speak")
+async def speak(request: SpeakRequest):
+    _validate(request.text, request.language)
+    text = prepare_tts_text(request.text)
+    audio_bytes, audio_file = await run_in_threadpool(speak_text, text, request.language)
+    if not audio_bytes:
+        raise HTTPException(status_code=502, detail="Audio generation failed")
+    media_type = audio_format(audio_bytes)
+    # speak_text may have fallen back to offline TTS, which caches WAV under its own key
+    engine = "pyttsx3" if media_type == "audio/wav" else "gtts"
+    audio_id = audio_cache_key(text, LANG_CODES[request.language], engine)
+    return {"audio_id": audio_id, "format": media_type, "url": f"/audio/{audio_id}"}
+
+
+@app.get("/audio/{audio_id}")
+def audio(audio_id: str):
+    audio_bytes, audio_file = audio_cache.get(audio_id)
+    if not audio_bytes:
+        raise HTTPException(status_code=404, detail="Unknown or evicted audio id")
+    return Response(
+        audio_bytes,
+        media_type=audio_format(audio_bytes),
+        # The id is a hash of text, language and engine, so the bytes never change
+        headers={"Cache-Control": "public, max-age=31536000, immutable", "ETag": f'"{audio_id}"'},
+    )
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the LocalLearn HTTP API.")
+    parser.add_argument("--host", default=os.getenv("LOCALLEARN_API_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("LOCALLEARN_API_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes (caches are shared through SQLite and the audio cache dir)")
+    args = parser.parse_args()
+    uvicorn.run("api_server:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Benchmark ask_tutor and speak_text against local stub backends.
+
+No network or API key is needed: Gemini and gTTS are replaced by stand-ins
+with configurable latency, streaming and error-injection profiles (see
+benchmarks/stub_backends.py), while the app's own caching, coalescing, rate
+limiting and chunking code runs unchanged.
+
+    python benchmark.py                        # all workloads, typical profile
+    python benchmark.py --profile flaky --sessions 16
+    python benchmark.py --save baseline        # write benchmarks/baselines/baseline.json
+    python benchmark.py --compare baseline     # fail if p95 regressed past --threshold
+
+Each workload reports throughput and p50/p95/p99 latency.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.stub_backends import PROFILES, StubBackend, install
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "baselines")
+LANGUAGES = ["Hindi", "Tamil", "Kannada", "Bengali"]
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summarize(name, samples, errors, elapsed, extra=None):
+    result = {
+        "workload": name,
+        "calls": len(samples) + errors,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_per_s": round((len(samples) + errors) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(statistics.mean(samples) * 1000, 2) if samples else None,
+        "p50_ms": None, "p95_ms": None, "p99_ms": None,
+    }
+    for q in (50, 95, 99):
+        value = percentile(samples, q)
+        result[f"p{q}_ms"] = round(value * 1000, 2) if value is not None else None
+    result.update(extra or {})
+    return result
+
+
+def timed_call(fn):
+    """Run fn and return (seconds, error)."""
+    start = time.perf_counter()
+    try:
+        fn()
+        return time.perf_counter() - start, None
+    except Exception as e:
+        return time.perf_counter() - start, e
+
+
+def run_sequential(name, calls):
+    samples, errors = [], 0
+    start = time.perf_counter()
+    for call in calls:
+        seconds, error = timed_call(call)
+        if error is None:
+            samples.append(seconds)
+        else:
+            errors += 1
+    return summarize(name, samples, errors, time.perf_counter() - start)
+
+
+def run_concurrent(name, sessions, calls_per_session):
+    """Run one thread per simulated session, each making its calls in order."""
+    samples, errors = [], [0]
+    lock = threading.Lock()
+
+    def session(calls):
+        for call in calls:
+            seconds, error = timed_call(call)
+            with lock:
+                if error is None:
+                    samples.append(seconds)
+                else:
+                    errors[0] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(sessions)) as pool:
+        list(pool.map(session, [calls_per_session(i) for i in sessions]))
+    return summarize(name, samples, errors[0], time.perf_counter() - start)
+
+
+def run_benchmarks(args, backend):
+    # Imported after the stubs are installed
+    from agents.tutor_agent import ask_tutor, ask_tutor_batch, ask_tutor_stream
+    from utils.audio_utils import speak_text
+
+    run_id = f"{os.getpid()}-{time.time_ns()}"
+    results = []
+
+    def topic(label, i):
+        # Unique per run and dissimilar enough that the fuzzy topic index
+        # never maps one benchmark topic onto another's cached answer
+        return "topic " + hashlib.sha1(f"{run_id}/{label}/{i}".encode()).hexdigest()[:20]
+
+    def stream_call(t, language, ttft):
+        def call():
+            start = time.perf_counter()
+            first = True
+            for chunk in ask_tutor_stream(t, language):
+                if first:
+                    ttft.append(time.perf_counter() - start)
+                    first = False
+        return call
+
+    n = args.iterations
+    workloads = set(args.workloads)
+
+    if "single" in workloads:
+        results.append(run_sequential("single_cold", [
+            (lambda t=topic("cold", i): ask_tutor(t, "Hindi")) for i in range(n)
+        ]))
+        warm = topic("warm", 0)
+        ask_tutor(warm, "Hindi")
+        results.append(run_sequential("single_warm", [
+            (lambda: ask_tutor(warm, "Hindi")) for _ in range(n)
+        ]))
+
+    if "stream" in workloads:
+        ttft = []
+        result = run_sequential("stream_cold", [
+            stream_call(topic("stream", i), "Tamil", ttft) for i in range(n)
+        ])
+        for q in (50, 95, 99):
+            value = percentile(ttft, q)
+            result[f"ttft_p{q}_ms"] = round(value * 1000, 2) if value is not None else None
+        results.append(result)
+
+    if "concurrent" in workloads:
+        # Sessions alternate between their own topics and topics every
+        # session asks in the same language (exercises request coalescing)
+        def session_calls(s):
+            calls = []
+            for i in range(args.calls_per_session):
+                if i % 2:
+                    t, language = topic("shared", i), "Hindi"
+                else:
+                    t, language = topic(f"session{s}", i), LANGUAGES[s % len(LANGUAGES)]
+                calls.append(lambda t=t, language=language: ask_tutor(t, language))
+            return calls
+        calls_before = backend.gemini_calls
+        result = run_concurrent("concurrent_sessions", range(args.sessions), session_calls)
+        result["upstream_calls"] = backend.gemini_calls - calls_before
+        result["sessions"] = args.sessions
+        results.append(result)
+
+    if "batch" in workloads:
+        # One sample per batch; throughput counts items
+        errors = [0]
+
+        def batch_call(r):
+            def call():
+                items = [(topic(f"batch{r}", i), LANGUAGES[i % len(LANGUAGES)], bool(i % 2))
+                         for i in range(args.batch_size)]
+                batch = ask_tutor_batch(items, max_concurrency=args.batch_concurrency)
+                errors[0] += sum(1 for explanation, error in batch if error is not None)
+            return call
+        result = run_sequential("batch", [batch_call(r) for r in range(args.batch_rounds)])
+        result["items"] = args.batch_size * args.batch_rounds
+        result["item_errors"] = errors[0]
+        result["throughput_per_s"] = round(result["items"] / result["elapsed_s"], 2)
+        results.append(result)
+
+    if "tts" in workloads:
+        text = backend.answer("tts")
+        results.append(run_sequential("tts_cold", [
+            (lambda i=i: _speak_or_raise(speak_text, f"{i} {run_id} {text}", "Hindi")) for i in range(n)
+        ]))
+        results.append(run_sequential("tts_warm", [
+            (lambda: _speak_or_raise(speak_text, f"0 {run_id} {text}", "Hindi")) for _ in range(n)
+        ]))
+        results.append(run_concurrent("tts_concurrent", range(args.sessions), lambda s: [
+            (lambda i=i: _speak_or_raise(speak_text, f"c{s} {i} {run_id} {text}", "Tamil"))
+            for i in range(args.calls_per_session)
+        ]))
+
+    return results
+
+
+def _speak_or_raise(speak_text, text, language):
+    # speak_text reports failures as (None, None) rather than raising
+    audio_bytes, audio_file = speak_text(text, language)
+    if not audio_bytes:
+        raise Exception("No audio generated")
+
+
+def print_report(results, baseline=None):
+    columns = ["calls", "errors", "throughput_per_s", "p50_ms", "p95_ms", "p99_ms"]
+    print(f"{'workload':<22}" + "".join(f"{c:>18}" for c in columns))
+    baseline_by_name = {r["workload"]: r for r in (baseline or {}).get("results", [])}
+    for result in results:
+        row = f"{result['workload']:<22}"
+        for column in columns:
+            value = result.get(column)
+            row += f"{'-' if value is None else value:>18}"
+        print(row)
+        extras = {k: v for k, v in result.items()
+                  if k.startswith("ttft_") or k in ("upstream_calls", "items", "item_errors")}
+        if extras:
+            print(" " * 22 + "  ".join(f"{k}={v}" for k, v in extras.items()))
+        previous = baseline_by_name.get(result["workload"])
+        if previous:
+            print(" " * 22 + "  ".join(
+                f"{k} {_change(previous.get(k), result.get(k))}"
+                for k in ("throughput_per_s", "p50_ms", "p95_ms", "p99_ms")
+                if previous.get(k) is not None and result.get(k) is not None
+            ))
+
+
+def _change(before, after):
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def regressions(results, baseline, threshold, noise_ms):
+    """
+    Workloads whose p95 grew, or throughput fell, by more than threshold.
+
+    Changes smaller than noise_ms in absolute terms are ignored, so cache-hit
+    workloads measured in microseconds do not trip the check on jitter alone.
+    """
+    found = []
+    baseline_by_name = {r["workload"]: r for r in baseline.get("results", [])}
+    for result in results:
+        previous = baseline_by_name.get(result["workload"])
+        if not previous:
+            continue
+        before, after = previous.get("p95_ms"), result.get("p95_ms")
+        if before and after is not None and after - before > max(noise_ms, before * threshold):
+            found.append(f"{result['workload']} p95_ms: {before} -> {after} "
+                         f"({(after - before) / before * 100:+.1f}%)")
+        before, after = previous.get("throughput_per_s"), result.get("throughput_per_s")
+        if (before and after is not None and (previous.get("mean_ms") or 0) >= noise_ms
+                and (before - after) / before > threshold):
+            found.append(f"{result['workload']} throughput_per_s: {before} -> {after} "
+                         f"({(after - before) / before * 100:+.1f}%)")
+    return found
+
+
+def baseline_path(name):
+    return name if name.endswith(".json") else os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LocalLearn against stub Gemini/TTS backends.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="typical",
+                        help="Stub latency/error profile (default: typical)")
+    parser.add_argument("--workloads", nargs="+",
+                        choices=["single", "stream", "concurrent", "batch", "tts"],
+                        default=["single", "stream", "concurrent", "batch", "tts"])
+    parser.add_argument("--iterations", type=int, default=20, help="Calls per sequential workload")
+    parser.add_argument("--sessions", type=int, default=8, help="Simulated concurrent sessions")
+    parser.add_argument("--calls-per-session", type=int, default=6)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--batch-concurrency", type=int, default=8)
+    parser.add_argument("--batch-rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0, help="Seed for stub latency jitter and errors")
+    parser.add_argument("--production-limits", action="store_true",
+                        help="Keep the configured Gemini/gTTS rate limits instead of lifting them")
+    parser.add_argument("--save", metavar="NAME", help="Save results as a baseline")
+    parser.add_argument("--compare", metavar="NAME", help="Compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative regression that fails --compare (default: 0.2)")
+    parser.add_argument("--noise-ms", type=float, default=2.0,
+                        help="Ignore latency changes smaller than this (default: 2.0)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    # Isolate the run from the real caches, and measure the code rather than
+    # the rate limiter unless asked to
+    scratch = tempfile.mkdtemp(prefix="locallearn-bench-")
+    os.environ["LOCALLEARN_CACHE_DB"] = ""
+    os.environ["LOCALLEARN_TOPIC_DB"] = ""
+    os.environ["LOCALLEARN_ACCESS_LOG"] = ""
+    os.environ["LOCALLEARN_AUDIO_CACHE_DIR"] = os.path.join(scratch, "audio")
+    os.environ.setdefault("GOOGLE_API_KEY", "AIzaBenchmarkStubKey")
+    if not args.production_limits:
+        for name in ("GEMINI", "GTTS"):
+            os.environ[f"LOCALLEARN_{name}_RATE"] = "100000"
+            os.environ[f"LOCALLEARN_{name}_BURST"] = "100000"
+    os.environ.setdefault("LOCALLEARN_LOG_LEVEL", "ERROR")
+
+    backend = install(StubBackend(args.profile, seed=args.seed))
+    from utils.metrics import export_json
+    try:
+        results = run_benchmarks(args, backend)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {
+        "profile": args.profile,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("save", "compare", "json")},
+        "results": results,
+        # Per-stage latency recorded by utils/metrics.py during the run
+        "stages": [h for h in export_json()["histograms"] if h["name"] == "stage_seconds"],
+    }
+
+    baseline = None
+    if args.compare:
+        with open(baseline_path(args.compare), encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("profile") != args.profile:
+            print(f"⚠️ Baseline profile is {baseline.get('profile')}, this run is {args.profile}")
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Profile: {args.profile}  (Gemini calls: {backend.gemini_calls}, TTS calls: {backend.tts_calls})")
+        print_report(results, baseline)
+
+    if args.save:
+        path = baseline_path(args.save)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"💾 Saved baseline to {path}")
+
+    if baseline is not None:
+        found = regressions(results, baseline, args.threshold, args.noise_ms)
+        if found:
+            print(f"❌ Regressions beyond {args.threshold:.0%}:")
+            for line in found:
+                print(f"   {line}")
+            return 1
+        print("✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Start-up import cost report based on python -X importtime.
+
+Each module is imported in a fresh interpreter several times; the report
+lists the median cumulative import time and which heavy SDKs were loaded as a
+side effect, and the cold start of main.py itself (a fresh interpreter running
+the script once in Streamlit's bare mode). With --baseline, the same figures
+for another checkout (e.g. an older commit) are listed as "before". Run from
+the repository root:
+
+    python -m benchmarks.import_time                 # print the report
+    python -m benchmarks.import_time --write         # update benchmarks/startup_report.md
+    git worktree add /tmp/locallearn-baseline <commit>
+    python -m benchmarks.import_time --baseline /tmp/locallearn-baseline --write
+"""
+
+import argparse
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORT_PATH = os.path.join(ROOT, "benchmarks", "startup_report.md")
+
+# What main.py imports before the first element is drawn
+APP_MODULES = [
+    "utils.theme",
+    "utils.metrics",
+    "utils.access_log",
+    "utils.content_pack",
+    "agents.tutor_agent",
+    "utils.audio_utils",
+    "utils.api_client",
+    "utils.artifact_store",
+    "utils.image_ingest",
+    "utils.audio_pipeline",
+    "utils.prefetch",
+]
+
+# Third-party packages that should only load on first use
+HEAVY_MODULES = ["google.generativeai", "gtts", "PIL", "pyttsx3"]
+
+# Imported by main.py itself; listed for reference
+SDK_MODULES = ["streamlit", "dotenv"] + HEAVY_MODULES
+
+# Keep the measured runs away from the real caches and logs
+BENCHMARK_ENV = {
+    "LOCALLEARN_CACHE_DB": "",
+    "LOCALLEARN_TOPIC_DB": "",
+    "LOCALLEARN_ACCESS_LOG": "",
+    "LOCALLEARN_LOG_LEVEL": "ERROR",
+}
+
+
+def _env():
+    env = dict(os.environ, **BENCHMARK_ENV)
+    env.pop("LOCALLEARN_METRICS_PORT", None)
+    env.setdefault("GOOGLE_API_KEY", "AIzaBenchmarkStubKey")
+    return env
+
+
+def measure(module, runs, root=ROOT):
+    """
+    Import module in fresh interpreters.
+
+    Returns:
+        (median cumulative microseconds, heavy modules loaded, error)
+    """
+    samples = []
+    loaded = set()
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=root, capture_output=True, text=True, env=_env(),
+        )
+        if proc.returncode != 0:
+            last_line = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed"
+            return None, set(), last_line
+        cumulative = None
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            parts = [part.strip() for part in line[len("import time:"):].split("|")]
+            if not parts[0].isdigit():
+                continue
+            name = parts[2]
+            if name.strip() == module:
+                cumulative = int(parts[1])
+            for heavy in HEAVY_MODULES:
+                if name.strip() == heavy:
+                    loaded.add(heavy)
+        if cumulative is not None:
+            samples.append(cumulative)
+    if not samples:
+        return None, loaded, "module already imported by the interpreter"
+    return statistics.median(samples), loaded, None
+
+
+def measure_cold_start(runs, root=ROOT):
+    """
+    Run main.py once per fresh interpreter (Streamlit bare mode, no server).
+
+    Returns:
+        (median wall-clock milliseconds, error)
+    """
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", "import runpy; runpy.run_path('main.py', run_name='__main__')"],
+            cwd=root, capture_output=True, text=True, env=_env(),
+        )
+        if proc.returncode != 0:
+            last_line = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "main.py failed"
+            return None, last_line
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), None
+
+
+def _cell(micros, loaded, error, module):
+    if error == f"ModuleNotFoundError: No module named '{module}'":
+        return "n/a", "not in this tree"
+    if error:
+        return "n/a", f"not importable: {error}"
+    return f"{micros / 1000:.1f}", ", ".join(sorted(loaded - {module})) or "none"
+
+
+def _describe(root):
+    """The commit checked out at root, or its directory name."""
+    proc = subprocess.run(["git", "-C", root, "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    return f"commit {proc.stdout.strip()}" if proc.returncode == 0 else os.path.basename(os.path.normpath(root))
+
+
+def build_report(runs, baseline=None):
+    lines = [
+        "# Start-up import report",
+        "",
+        f"Generated {time.strftime('%Y-%m-%d')} with `python -m benchmarks.import_time --write` "
+        f"(Python {platform.python_version()}, {platform.system()}, median of {runs} fresh interpreters).",
+    ]
+    if baseline:
+        lines += [
+            "",
+            f"\"Before\" is {_describe(baseline)} (`--baseline`), \"after\" is {_describe(ROOT)}.",
+            "",
+            "| Module | Before (ms) | After (ms) | Heavy SDKs loaded before | Heavy SDKs loaded after |",
+            "| --- | ---: | ---: | --- | --- |",
+        ]
+    else:
+        lines += [
+            "",
+            "| Module | Cumulative import (ms) | Heavy SDKs loaded |",
+            "| --- | ---: | --- |",
+        ]
+
+    cold_ms, cold_error = measure_cold_start(runs)
+    after_cold = "n/a" if cold_error else f"{cold_ms:.1f}"
+    if baseline:
+        before_ms, before_error = measure_cold_start(runs, root=baseline)
+        before_cold = "n/a" if before_error else f"{before_ms:.1f}"
+        lines.append(f"| `main.py` cold start (interpreter + script) | {before_cold} | {after_cold} | | |")
+    else:
+        lines.append(f"| `main.py` cold start (interpreter + script) | {after_cold} | {cold_error or ''} |")
+
+    for module in APP_MODULES + SDK_MODULES:
+        after_ms, after_heavy = _cell(*measure(module, runs), module)
+        if baseline:
+            before_ms, before_heavy = _cell(*measure(module, runs, root=baseline), module)
+            lines.append(f"| `{module}` | {before_ms} | {after_ms} | {before_heavy} | {after_heavy} |")
+        else:
+            lines.append(f"| `{module}` | {after_ms} | {after_heavy} |")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report start-up import cost with python -X importtime.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--write", action="store_true", help=f"Write the report to {REPORT_PATH}")
+    parser.add_argument("--baseline", metavar="PATH", help="Checkout to report as \"before\", e.g. a git worktree")
+    args = parser.parse_args()
+
+    report = build_report(args.runs, baseline=args.baseline)
+    print(report)
+    if args.write:
+        with open(REPORT_PATH, "w", encoding="utf-8") as f:
+            f.write(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Measure Streamlit rerun cost of main.py with streamlit.testing's AppTest.
+
+Gemini and gTTS are replaced by the instant stub backends, so the numbers
+are the script's own CPU time per rerun (page setup, CSS, rendering, audio
+embedding), not upstream latency. Run from the repository root:
+
+    python -m benchmarks.rerun_time --runs 30
+    python -m benchmarks.rerun_time --script /tmp/main_before.py   # e.g. an older main.py
+
+AppTest always executes the whole script, so widget interactions are
+measured as full reruns. In a live app, widgets inside st.fragment sections
+(the inputs, and the buttons with the explanation and audio below them)
+rerun only their fragment; the report lists the mean time of each fragment
+body (the "fragment" stage in utils.metrics) during the measured reruns as
+that rerun's script cost.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _widget(at, kind, label_start):
+    for widget in getattr(at, kind):
+        if widget.label.startswith(label_start):
+            return widget
+    raise LookupError(f"No {kind} labelled {label_start!r}")
+
+
+def _fragment_totals():
+    from utils.metrics import export_json
+
+    return {
+        histogram["labels"]["section"]: (histogram["count"], histogram["sum"])
+        for histogram in export_json()["histograms"]
+        if histogram["labels"].get("stage") == "fragment"
+    }
+
+
+def measure(script, runs):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(script, default_timeout=120)
+    at.run()
+    _widget(at, "text_input", "Enter any topic").input("Newton's first law")
+    _widget(at, "button", "🎯 Explain").click()
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception)
+
+    # Fragment times exclude the first Explain click, which generates the answer
+    fragments_before = _fragment_totals()
+    results = {}
+    # Any interaction with an explanation and its audio on the page
+    results["full_rerun_with_explanation"] = _timed(at.run, runs)
+
+    checkbox = _widget(at, "checkbox", "🔊 Start audio")
+
+    def toggle():
+        checkbox.set_value(not checkbox.value)
+        at.run()
+    results["toggle_checkbox"] = _timed(toggle, runs)
+
+    topic_input = _widget(at, "text_input", "Enter any topic")
+    counter = iter(range(10 ** 6))
+
+    def type_topic():
+        topic_input.input(f"Photosynthesis {next(counter)}")
+        at.run()
+    results["edit_topic_input"] = _timed(type_topic, runs)
+
+    fragments = {}
+    for section, (count, total) in _fragment_totals().items():
+        count_before, total_before = fragments_before.get(section, (0, 0.0))
+        if count > count_before:
+            fragments[section] = (total - total_before) / (count - count_before) * 1000
+    return results, fragments
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure main.py rerun time with AppTest.")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--script", default=os.path.join(ROOT, "main.py"), help="App script to measure")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="locallearn-rerun-")
+    os.environ["LOCALLEARN_CACHE_DB"] = ""
+    os.environ["LOCALLEARN_TOPIC_DB"] = ""
+    os.environ["LOCALLEARN_ACCESS_LOG"] = ""
+    os.environ["LOCALLEARN_AUDIO_CACHE_DIR"] = os.path.join(scratch, "audio")
+    os.environ.setdefault("GOOGLE_API_KEY", "AIzaBenchmarkStubKey")
+    os.environ.setdefault("LOCALLEARN_LOG_LEVEL", "ERROR")
+    sys.path.insert(0, ROOT)
+
+    from benchmarks.stub_backends import StubBackend, install
+    install(StubBackend("instant"), stub_streamlit=False)
+
+    results, fragments = measure(os.path.abspath(args.script), args.runs)
+    print(f"{'scenario':<32}{'median ms':>12}{'p95 ms':>12}")
+    for name, samples in results.items():
+        ordered = sorted(samples)
+        p95 = ordered[max(0, int(round(0.95 * len(ordered))) - 1)]
+        print(f"{name:<32}{statistics.median(samples):>12.2f}{p95:>12.2f}")
+
+    for section, mean in sorted(fragments.items()):
+        print(f"{'fragment ' + section:<32}{mean:>12.2f}{'(mean)':>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import random
+import sys
+import threading
+import time
+import types
+
+# Local stand-ins for the Gemini and gTTS SDKs used by the benchmark suite.
+# install() puts fake google.generativeai, gtts and streamlit modules into
+# sys.modules before the app modules are imported, so ask_tutor and speak_text
+# run their real code paths (caches, coalescing, rate limiting, chunking)
+# against backends with controlled latency, streaming and failure behaviour.
+
+# Latency/error profiles. Times are seconds; rates are probabilities per call.
+PROFILES = {
+    "instant": dict(
+        gemini_latency=0.0, gemini_jitter=0.0, gemini_ttft=0.0, gemini_chunks=4,
+        tts_latency=0.0, tts_per_char=0.0, error_rate=0.0, rate_limit_rate=0.0,
+    ),
+    "typical": dict(
+        gemini_latency=0.8, gemini_jitter=0.3, gemini_ttft=0.25, gemini_chunks=12,
+        tts_latency=0.15, tts_per_char=0.0015, error_rate=0.0, rate_limit_rate=0.0,
+    ),
+    "slow": dict(
+        gemini_latency=2.5, gemini_jitter=1.0, gemini_ttft=0.9, gemini_chunks=20,
+        tts_latency=0.4, tts_per_char=0.004, error_rate=0.0, rate_limit_rate=0.0,
+    ),
+    "flaky": dict(
+        gemini_latency=0.8, gemini_jitter=0.3, gemini_ttft=0.25, gemini_chunks=12,
+        tts_latency=0.15, tts_per_char=0.0015, error_rate=0.05, rate_limit_rate=0.1,
+    ),
+}
+
+SAMPLE_SENTENCE = (
+    "Think of it like a BMTC bus braking suddenly: your body keeps moving forward "
+    "because it wants to continue what it was already doing."
+)
+
+
+class StubBackend:
+    """Shared configuration and call counters for the fake SDKs."""
+
+    def __init__(self, profile="typical", seed=0, answer_sentences=8):
+        self.profile = dict(PROFILES[profile])
+        self.profile_name = profile
+        self.answer_sentences = answer_sentences
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.gemini_calls = 0
+        self.tts_calls = 0
+
+    def _uniform(self, low, high):
+        with self._lock:
+            return self._random.uniform(low, high)
+
+    def _latency(self, base, jitter):
+        return max(0.0, base + self._uniform(-jitter, jitter))
+
+    def _maybe_fail(self, service):
+        roll = self._uniform(0, 1)
+        if roll < self.profile["rate_limit_rate"]:
+            raise Exception(f"429 Resource exhausted ({service} stub)")
+        if roll < self.profile["rate_limit_rate"] + self.profile["error_rate"]:
+            raise Exception(f"503 Service unavailable ({service} stub)")
+
+    def answer(self, topic):
+        return " ".join([f"{topic}:"] + [SAMPLE_SENTENCE] * self.answer_sentences)
+
+    def generate(self, topic, stream):
+        with self._lock:
+            self.gemini_calls += 1
+        self._maybe_fail("Gemini")
+        text = self.answer(topic)
+        total = self._latency(self.profile["gemini_latency"], self.profile["gemini_jitter"])
+        if not stream:
+            time.sleep(total)
+            return _Response(text)
+        return self._stream(text, total)
+
+    def _stream(self, text, total):
+        chunks = max(1, self.profile["gemini_chunks"])
+        ttft = min(total, self.profile["gemini_ttft"])
+        step = (total - ttft) / chunks
+        size = -(-len(text) // chunks)
+        time.sleep(ttft)
+        for start in range(0, len(text), size):
+            yield _Response(text[start:start + size])
+            time.sleep(step)
+
+    def synthesize(self, text):
+        with self._lock:
+            self.tts_calls += 1
+        self._maybe_fail("gTTS")
+        time.sleep(self.profile["tts_latency"] + self.profile["tts_per_char"] * len(text))
+        # Roughly 1 KB of "MP3" per 60 characters, with an ID3 tag like gTTS output
+        return b"ID3\x04\x00\x00\x00\x00\x00\x00" + b"\xff\xfb" * (len(text) * 8 + 1)
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+def _gemini_module(backend):
+    genai = types.ModuleType("google.generativeai")
+
+    def configure(api_key=None, **kwargs):
+        pass
+
+    class GenerativeModel:
+        def __init__(self, model_name, system_instruction=None, **kwargs):
+            self.model_name = model_name
+            self.system_instruction = system_instruction
+
+        def generate_content(self, contents, stream=False, **kwargs):
+            if isinstance(contents, list):
+                # A conversation: answer about its opening user turn
+                contents = contents[0]["parts"][0]
+            return backend.generate(contents, stream)
+
+    genai.configure = configure
+    genai.GenerativeModel = GenerativeModel
+    return genai
+
+
+def _gtts_module(backend):
+    gtts = types.ModuleType("gtts")
+
+    class gTTS:
+        def __init__(self, text, lang="en", slow=False, **kwargs):
+            self.text = text
+
+        def write_to_fp(self, fp):
+            fp.write(backend.synthesize(self.text))
+
+        def save(self, path):
+            with open(path, "wb") as f:
+                self.write_to_fp(f)
+
+    gtts.gTTS = gTTS
+    return gtts
+
+
+def _streamlit_module():
+    # speak_text reports fallbacks through st.warning/st.info; keep them quiet
+    st = types.ModuleType("streamlit")
+    for name in ("warning", "info", "error", "success", "audio", "markdown", "write"):
+        setattr(st, name, lambda *args, **kwargs: None)
+    return st
+
+
+def install(backend, stub_streamlit=True):
+    """
+    Replace the external SDKs with stubs driven by backend.
+
+    Must run before agents.tutor_agent or utils.audio_utils is imported.
+    Offline TTS (pyttsx3) is disabled so fallbacks do not spawn a worker.
+    Pass stub_streamlit=False to keep the real Streamlit (e.g. for AppTest).
+    """
+    google = sys.modules.get("google")
+    if google is None:
+        try:
+            import google
+        except ImportError:
+            google = types.ModuleType("google")
+            google.__path__ = []
+            sys.modules["google"] = google
+    genai = _gemini_module(backend)
+    google.generativeai = genai
+    sys.modules["google.generativeai"] = genai
+    sys.modules["gtts"] = _gtts_module(backend)
+    if stub_streamlit:
+        sys.modules["streamlit"] = _streamlit_module()
+    sys.modules["pyttsx3"] = None
+    return backend
+
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Build an offline content pack from a curriculum topic list.
+
+The pack holds detailed and simplified explanations for every topic and
+language, plus pre-synthesized audio, so the app can serve common topics
+with no network access:
+
+    python build_pack.py topics.txt -o locallearn.pack
+    LOCALLEARN_PACK=locallearn.pack streamlit run main.py
+
+The topic file has one topic per line; blank lines and lines starting
+with '#' are ignored.
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from agents.tutor_agent import REGIONAL_CONTEXTS, ask_tutor_batch
+from utils.access_log import access_log
+from utils.audio_utils import prepare_tts_text, speak_text
+from utils.content_pack import PackWriter
+
+
+def read_topics(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+
+def synthesize(text, language):
+    """Return audio bytes for text (the file speak_text returns is owned by the audio cache)."""
+    audio_bytes, audio_file = speak_text(text, language)
+    return audio_bytes
+
+
+def build_pack(topics, languages, output, with_audio=True, max_concurrency=8, audio_concurrency=2):
+    items = [(topic, language, simplify)
+             for topic in topics
+             for language in languages
+             for simplify in (False, True)]
+    print(f"📚 Generating {len(items)} explanations ({len(topics)} topics × {len(languages)} languages × 2 modes)...")
+    results = ask_tutor_batch(items, max_concurrency=max_concurrency)
+
+    failures = 0
+    with PackWriter(output) as writer:
+        audio_jobs = []
+        for (topic, language, simplify), (explanation, error) in zip(items, results):
+            if error is not None:
+                failures += 1
+                print(f"❌ {topic} [{language}, {'simple' if simplify else 'detailed'}]: {error}")
+                continue
+            writer.add_explanation(topic, language, simplify, explanation)
+            if with_audio:
+                audio_jobs.append((prepare_tts_text(explanation), language))
+
+        if audio_jobs:
+            print(f"🔊 Synthesizing {len(audio_jobs)} audio clips...")
+            with ThreadPoolExecutor(max_workers=audio_concurrency) as pool:
+                clips = pool.map(lambda job: synthesize(*job), audio_jobs)
+                for (text, language), audio_bytes in zip(audio_jobs, clips):
+                    if audio_bytes:
+                        writer.add_audio(text, language, audio_bytes)
+                    else:
+                        failures += 1
+                        print(f"❌ Audio failed [{language}]: {text[:40]}...")
+
+        record_count = len(writer)
+
+    size_kb = os.path.getsize(output) / 1024
+    print(f"✅ Wrote {record_count} records to {output} ({size_kb:.1f} KB), {failures} failures")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an offline LocalLearn content pack.")
+    parser.add_argument("topics", help="Text file with one topic per line")
+    parser.add_argument("-o", "--output", default="locallearn.pack", help="Output pack file")
+    parser.add_argument("-l", "--languages", nargs="+", default=list(REGIONAL_CONTEXTS),
+                        choices=list(REGIONAL_CONTEXTS), help="Languages to include (default: all)")
+    parser.add_argument("--no-audio", action="store_true", help="Skip audio synthesis")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel Gemini requests")
+    parser.add_argument("--audio-concurrency", type=int, default=2, help="Parallel TTS requests")
+    args = parser.parse_args()
+
+    load_dotenv()
+    # Pack builds are not student traffic
+    access_log.enabled = False
+    topics = read_topics(args.topics)
+    if not topics:
+        print(f"❌ No topics found in {args.topics}")
+        return 1
+
+    failures = build_pack(topics, args.languages, args.output,
+                          with_audio=not args.no_audio,
+                          max_concurrency=args.concurrency,
+                          audio_concurrency=args.audio_concurrency)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,33 @@
 import streamlit as st
 import os
+import uuid
 from dotenv import load_dotenv
-from agents.tutor_agent import ask_tutor
-from utils.audio_utils import speak_text, play_audio
-from PIL import Image
+from agents.tutor_agent import ask_follow_up_stream, ask_tutor_stream, extend_conversation, start_conversation
+from utils.audio_utils import speak_text, play_audio, prepare_tts_text, queue_audio
+from utils.api_client import api_client
+from utils.artifact_store import artifact_store, start_reaper
+from utils.content_pack import open_pack
+from utils.image_ingest import image_ingestor
+from utils.prefetch import start_prefetch, claim_prefetch, cancel_prefetch
+from utils.audio_pipeline import speak_stream, join_sentence_audio
+from utils.metrics import start_metrics_server, timed
+from utils.theme import BANNER_HTML, FOOTER_HTML, explanation_html, format_explanation_html, theme_css
 
 # Load environment variables
 load_dotenv()
 
+# Optional offline content pack (built with build_pack.py), served before any API call
+content_pack = open_pack(os.getenv("LOCALLEARN_PACK"))
+
+# With LOCALLEARN_API_URL set, explanations and audio come from api_server.py
+speak = api_client.speak if api_client else speak_text
+
+# Prometheus/JSON metrics endpoint, started once per process if LOCALLEARN_METRICS_PORT is set
+start_metrics_server()
+
+# Releases audio of sessions that went away and deletes orphaned TTS temp files
+start_reaper()
+
 # Initialize theme in session state
 if 'dark_theme' not in st.session_state:
     st.session_state.dark_theme = True
@@ -20,196 +40,11 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for Dark Theme UI
-st.markdown("""
-    <style>
-    /* Overall dark theme */
-    .stApp {
-        background-color: #0a0a0a;
-        color: #ffffff;
-    }
-
-    /* Main content area */
-    .main .block-container {
-        background-color: #0a0a0a;
-        color: #ffffff;
-    }
-
-    /* Sidebar styling */
-    .sidebar .sidebar-content {
-        background-color: #1a1a1a;
-        color: #ffffff;
-    }
-
-    /* Input fields */
-    .stTextInput > div > div > input {
-        background-color: #2a2a2a !important;
-        color: #ffffff !important;
-        border: 1px solid #444444 !important;
-    }
-
-    /* Select boxes */
-    .stSelectbox > div > div > div {
-        background-color: #2a2a2a !important;
-        color: #ffffff !important;
-    }
-
-    /* Buttons */
-    .stButton > button {
-        background-color: #667eea !important;
-        color: #ffffff !important;
-        border: none !important;
-    }
-
-    .stButton > button:hover {
-        background-color: #764ba2 !important;
-        color: #ffffff !important;
-    }
-
-    /* Main banner with dark theme gradient */
-    .main-banner {
-        background: linear-gradient(135deg, #2a2a2a 0%, #4a4a4a 100%);
-        padding: 20px;
-        border-radius: 10px;
-        text-align: center;
-        margin-bottom: 30px;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.3);
-        border: 1px solid #555555;
-    }
-    .main-banner h1 {
-        color: #ffffff;
-        margin: 0;
-        font-size: 2.5em;
-        font-weight: bold;
-        text-shadow: 0 2px 4px rgba(0,0,0,0.5);
-    }
-    .main-banner p {
-        color: #cccccc;
-        margin: 5px 0 0 0;
-        font-size: 1.2em;
-    }
-
-    /* Output box for explanations */
-    .output-box {
-        background-color: #1a1a1a;
-        padding: 20px;
-        border-radius: 10px;
-        border-left: 5px solid #667eea;
-        margin-top: 20px;
-        font-size: 1.1em;
-        line-height: 1.6;
-        color: #ffffff !important;
-        white-space: pre-wrap;
-        word-wrap: break-word;
-        border: 1px solid #333333;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.2);
-    }
-
-    /* Slider styling */
-    .stSlider > div > div > div {
-        background-color: #2a2a2a !important;
-    }
-
-    /* Headers and text */
-    h1, h2, h3, h4, h5, h6 {
-        color: #ffffff !important;
-    }
-
-    /* Regular text */
-    p, span, div {
-        color: #cccccc;
-    }
-
-    /* Success messages */
-    .stSuccess {
-        background-color: #1a4a1a !important;
-        color: #90EE90 !important;
-    }
-
-    /* Warning messages */
-    .stWarning {
-        background-color: #4a4a1a !important;
-        color: #FFFFE0 !important;
-    }
-
-    /* Error messages */
-    .stError {
-        background-color: #4a1a1a !important;
-        color: #FFB6C1 !important;
-    }
-
-    /* Info messages */
-    .stInfo {
-        background-color: #1a4a4a !important;
-        color: #87CEEB !important;
-    }
-
-    /* Footer */
-    .footer-text {
-        color: #888888 !important;
-    }
-
-    /* Form labels and other text */
-    label, .stMarkdown, .stText {
-        color: #ffffff !important;
-    }
-
-    /* Radio buttons and checkboxes */
-    .stRadio > div, .stCheckbox > div {
-        color: #ffffff !important;
-    }
-
-    /* Table styling */
-    .dataframe {
-        background-color: #1a1a1a !important;
-        color: #ffffff !important;
-    }
-
-    /* Code blocks */
-    code {
-        background-color: #2a2a2a !important;
-        color: #ffffff !important;
-    }
-
-    /* Links */
-    a {
-        color: #667eea !important;
-    }
-
-    /* Horizontal rules */
-    hr {
-        border-color: #444444 !important;
-    }
-
-    /* Card-like elements */
-    .stCard {
-        background-color: #1a1a1a !important;
-        border: 1px solid #333333 !important;
-        border-radius: 10px !important;
-    }
-
-    /* Metric boxes */
-    .metric-container {
-        background-color: #1a1a1a !important;
-        border: 1px solid #333333 !important;
-        border-radius: 8px !important;
-        padding: 10px !important;
-    }
-
-    /* Smooth transitions */
-    * {
-        transition: background-color 0.3s ease, color 0.3s ease, border-color 0.3s ease;
-    }
-    </style>
-""", unsafe_allow_html=True)
+# Custom CSS for Dark Theme UI (built once per process, see utils/theme.py)
+st.markdown(theme_css(), unsafe_allow_html=True)
 
 # Banner
-st.markdown("""
-    <div class="main-banner">
-        <h1>🌍 LocalLearn – Science in Your Language & Style</h1>
-        <p>Learn any topic in your local language with real-life examples</p>
-    </div>
-""", unsafe_allow_html=True)
+st.markdown(BANNER_HTML, unsafe_allow_html=True)
 
 st.caption("Powered by Google Gemini AI | Intelligent Local Language Explanations")
 
@@ -222,151 +57,364 @@ if 'current_language' not in st.session_state:
     st.session_state.current_language = "Hindi"
 if 'simplified' not in st.session_state:
     st.session_state.simplified = False
-
-# Main interface
-col1, col2 = st.columns([2, 1])
-
-with col1:
+if 'conversation' not in st.session_state:
+    # Turns behind the current explanation, continued by the follow-up buttons
+    st.session_state.conversation = []
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+artifact_store.touch(st.session_state.session_id)
+
+def keep_audio(audio_bytes, explanation):
+    """Hold the session's audio in the shared artifact store; the session keeps only the ref."""
+    st.session_state.audio_ref = artifact_store.put(
+        audio_bytes, owner=st.session_state.session_id, slot="audio")
+    st.session_state.last_explanation = explanation
+
+# Input sections are fragments: typing a topic, uploading a photo or picking
+# a language reruns only that fragment, not the CSS, explanation and audio.
+# Their values reach the full-page rerun (button clicks) through widget keys.
+fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
+@fragment
+def topic_section():
+    with timed("fragment", section="topic"):
+        _topic_section()
+
+def _topic_section():
     st.subheader("📚 What do you want to learn?")
-    topic = st.text_input(
+    st.text_input(
         "Enter any topic:",
+        key="topic_input",
         placeholder="e.g., Newton's First Law, Photosynthesis, Gravity...",
         help="Type any science or educational topic you want to understand"
     )
-    
+
     # Optional: Image upload
     st.markdown("---")
     st.markdown("**📸 Or upload a textbook photo (optional)**")
     uploaded_file = st.file_uploader(
         "Upload image of textbook page",
         type=['png', 'jpg', 'jpeg'],
-        help="Upload a photo - you can then type the topic name"
+        help="Upload a photo - the topic is read from the page automatically"
     )
-    
+
+    st.session_state.photo_topic = None
     if uploaded_file:
-        image = Image.open(uploaded_file)
-        st.image(image, caption="Uploaded Textbook Image", use_column_width=True)
-        st.info("📝 Please type the topic name from the image above")
+        # Downscaled once and cached by content hash, so reruns are cheap
+        try:
+            with st.spinner("📖 Reading the page..."):
+                image_bytes, photo_topic = image_ingestor.ingest(uploaded_file.getvalue())
+            st.image(image_bytes, caption="Uploaded Textbook Image", use_column_width=True)
+            st.session_state.photo_topic = photo_topic
+            if photo_topic:
+                st.info(f"📝 Topic found in the photo: **{photo_topic}**. "
+                        "Press Explain, or type a different topic above.")
+            else:
+                st.info("📝 Please type the topic name from the image above")
+        except Exception as e:
+            st.error(f"❌ Could not read the image: {str(e)}")
 
-with col2:
+@fragment
+def language_section():
+    with timed("fragment", section="language"):
+        _language_section()
+
+def _language_section():
     st.subheader("🗣️ Select Your Language")
-    language = st.selectbox(
+    st.selectbox(
         "Choose your preferred language:",
         ["Hindi", "Tamil", "Telugu", "Bengali", "Marathi", "Gujarati", 
          "Kannada", "Malayalam", "Punjabi", "Urdu", "English"],
+        key="language",
         help="The explanation will use your local dialect and examples"
     )
-    st.session_state.current_language = language
-
-# Action buttons
-st.markdown("---")
-col_btn1, col_btn2, col_btn3 = st.columns(3)
-
-with col_btn1:
-    explain_btn = st.button("🎯 Explain", use_container_width=True)
-
-with col_btn2:
-    simpler_btn = st.button("🔍 Make Even Simpler", use_container_width=True, 
-                            disabled=not st.session_state.current_topic)
+    st.checkbox(
+        "🔊 Start audio while the explanation is being written",
+        key="progressive_audio",
+        value=True,
+        help="Each sentence is spoken as soon as it is ready"
+    )
 
-with col_btn3:
-    clear_btn = st.button("🔄 Clear", use_container_width=True)
+# Main interface
+col1, col2 = st.columns([2, 1])
 
-# Handle button clicks
-if explain_btn:
-    if topic.strip() == "":
-        st.warning("⚠️ Please enter a topic!")
-    else:
-        try:
-            with st.spinner(f"🤔 Generating explanation in {language}..."):
-                explanation = ask_tutor(topic, language, simplify=False)
-            st.session_state.explanation = explanation
-            st.session_state.current_topic = topic
-            st.session_state.simplified = False
-        except Exception as e:
-            st.error(f"❌ Error: {str(e)}")
-            st.info("Please try again or check your connection.")
-
-if simpler_btn and st.session_state.current_topic:
-    try:
-        with st.spinner(f"✨ Making it even simpler..."):
-            explanation = ask_tutor(st.session_state.current_topic, language, simplify=True)
-        st.session_state.explanation = explanation
-        st.session_state.simplified = True
-    except Exception as e:
-        st.error(f"❌ Error: {str(e)}")
-
-if clear_btn:
-    st.session_state.explanation = ""
-    st.session_state.current_topic = ""
-    st.session_state.simplified = False
-    st.rerun()
+with col1:
+    topic_section()
 
-# Display output
-if st.session_state.explanation:
+with col2:
+    language_section()
+
+def render_explanation(container, text, final=True):
+    """
+    Render explanation text inside the styled output box.
+
+    Final explanations are memoized, so reruns reuse the HTML; partial text
+    while streaming is formatted directly.
+    """
+    with timed("render"):
+        html = explanation_html(text) if final else format_explanation_html(text)
+        container.markdown(html, unsafe_allow_html=True)
+
+def explanation_chunks(topic, language, simplify, extracted_from_image=False, follow_up=None):
+    """
+    Yield explanation chunks from the content pack, falling back to Gemini on a miss.
+
+    follow_up ("simpler" or "example") continues the session's conversation
+    instead of asking about the topic from scratch.
+    """
+    if content_pack and follow_up != "example":
+        packed = content_pack.get_explanation(topic, language, simplify)
+        if packed:
+            return [packed]
+    if follow_up:
+        conversation = st.session_state.conversation
+        if api_client:
+            return api_client.follow_up_stream(conversation, language, follow_up)
+        return ask_follow_up_stream(conversation, language, follow_up)
+    if api_client:
+        return api_client.explain_stream(topic, language, simplify=simplify,
+                                         extracted_from_image=extracted_from_image)
+    return ask_tutor_stream(topic, language, simplify=simplify,
+                            extracted_from_image=extracted_from_image)
+
+def set_action(action):
+    """on_click callback of the action buttons."""
+    st.session_state.action = action
+
+def action_buttons():
+    col_btn1, col_btn2, col_btn3, col_btn4 = st.columns(4)
+
+    with col_btn1:
+        st.button("🎯 Explain", use_container_width=True, on_click=set_action, args=("explain",))
+
+    with col_btn2:
+        st.button("🔍 Make Even Simpler", use_container_width=True,
+                  disabled=not st.session_state.current_topic, on_click=set_action, args=("simpler",))
+
+    with col_btn3:
+        st.button("💡 Another Example", use_container_width=True,
+                  disabled=not st.session_state.conversation, on_click=set_action, args=("example",))
+
+    with col_btn4:
+        st.button("🔄 Clear", use_container_width=True, on_click=set_action, args=("clear",))
+
+# The buttons and the output below them are one fragment as well: a click
+# reruns only this section (streaming, explanation and audio), not the page
+# CSS and the input sections. Inputs are read from their widget keys on
+# every run, since a fragment rerun does not run the code around it.
+@fragment
+def output_section():
+    with timed("fragment", section="output"):
+        _output_section()
+
+def _output_section():
+    topic = st.session_state.get("topic_input", "")
+    photo_topic = st.session_state.get("photo_topic")
+    language = st.session_state.get("language", "Hindi")
+    progressive_audio = st.session_state.get("progressive_audio", True)
+
+    # Action buttons. Clicks are recorded by on_click callbacks, which run
+    # before this fragment; the row itself is drawn at the end of the run, so
+    # the follow-up buttons are enabled by the explanation this click produced.
     st.markdown("---")
-    st.subheader("📖 Explanation")
-    
-    # Display explanation
-    # Clean and format the explanation text
-    explanation_text = st.session_state.explanation.replace('\n', '<br>').replace('  ', '&nbsp;&nbsp;')
-    st.markdown(f'<div class="output-box">{explanation_text}</div>',
-                unsafe_allow_html=True)
-    
-    # Audio player (automatic generation)
-    st.markdown("### 🔊 Listen to Explanation")
-
-    # Automatically generate and play audio when explanation changes
-    try:
-        if st.session_state.get('last_explanation') != st.session_state.explanation:
-            st.info("🎵 Generating audio...")
-
-            # Prepare text for TTS (limit length and clean)
-            tts_text = st.session_state.explanation[:2000]  # Limit to 2000 chars for gTTS
-            tts_text = tts_text.replace('\n', ' ').replace('\r', ' ')  # Remove line breaks
-
-            # Generate new audio
-            audio_bytes, audio_file = speak_text(
-                tts_text,
-                st.session_state.current_language
-            )
+    button_row = st.container()
+    action = st.session_state.pop("action", None)
+    explain_btn = action == "explain"
+    simpler_btn = action == "simpler"
+    example_btn = action == "example"
+    clear_btn = action == "clear"
+
+    # Handle button clicks
+    # Requests are streamed into the output box below as
+    # (topic, language, simplify, extracted_from_image, follow_up)
+    stream_request = None
+
+    # Follow-ups continue the conversation only while it is in the selected language
+    can_follow_up = bool(st.session_state.conversation) and st.session_state.current_language == language
+
+    if explain_btn:
+        if topic.strip() == "" and not photo_topic:
+            st.warning("⚠️ Please enter a topic!")
+        else:
+            cancel_prefetch(st.session_state.session_id)
+            if topic.strip():
+                stream_request = (topic, language, False, False, None)
+            else:
+                stream_request = (photo_topic, language, False, True, None)
+
+    if simpler_btn and st.session_state.current_topic:
+        prefetched = None
+        if can_follow_up:
+            # Use the speculatively prefetched simple explanation if it is under way;
+            # audio still being synthesized is joined by the audio section below
+            with st.spinner(f"✨ Making it even simpler..."):
+                prefetched = claim_prefetch(st.session_state.session_id,
+                                            st.session_state.conversation, language)
+        if prefetched:
+            explanation, audio_bytes, audio_file = prefetched
+            st.session_state.conversation = extend_conversation(
+                st.session_state.conversation, "simpler", explanation)
+            st.session_state.explanation = explanation
+            st.session_state.current_language = language
+            st.session_state.simplified = True
             if audio_bytes:
-                st.session_state.audio_bytes = audio_bytes
-                st.session_state.audio_file = audio_file
-                st.session_state.last_explanation = st.session_state.explanation
-                st.success("✅ Audio generated successfully!")
+                keep_audio(audio_bytes, explanation)
+        else:
+            stream_request = (st.session_state.current_topic, language, True, False,
+                              "simpler" if can_follow_up else None)
+
+    if example_btn and st.session_state.conversation:
+        cancel_prefetch(st.session_state.session_id)
+        if can_follow_up:
+            stream_request = (st.session_state.current_topic, language, False, False, "example")
+        else:
+            st.warning("⚠️ Press Explain first to get the explanation in this language.")
+
+    if clear_btn:
+        cancel_prefetch(st.session_state.session_id)
+        st.session_state.explanation = ""
+        st.session_state.current_topic = ""
+        st.session_state.simplified = False
+        st.session_state.conversation = []
+        st.session_state.pop("audio_ref", None)
+        st.session_state.pop("last_explanation", None)
+        artifact_store.release(st.session_state.session_id, "audio")
+        st.rerun()
+
+    # Display output
+    if stream_request or st.session_state.explanation:
+        st.markdown("---")
+        st.subheader("📖 Explanation")
+        output_box = st.empty()
+
+        # Stream a new explanation into the output box as chunks arrive
+        if stream_request:
+            stream_topic, stream_language, stream_simplify, stream_from_image, follow_up = stream_request
+            if follow_up == "example":
+                spinner_text = "💡 Finding another example..."
+            elif stream_simplify:
+                spinner_text = "✨ Making it even simpler..."
             else:
-                st.warning("⚠️ Audio generation failed. This may be due to rate limiting.")
-                st.info("🔄 Try again in a few minutes or use shorter text.")
+                spinner_text = f"🤔 Generating explanation in {stream_language}..."
+            # Audio for packed explanations is already pre-synthesized
+            speak_while_streaming = progressive_audio and not (
+                content_pack and follow_up != "example"
+                and content_pack.get_explanation(stream_topic, stream_language, stream_simplify)
+            )
+            try:
+                explanation = ""
+                clips = []
+                with st.spinner(spinner_text):
+                    chunks = explanation_chunks(stream_topic, stream_language, stream_simplify,
+                                                stream_from_image, follow_up)
+                    if speak_while_streaming:
+                        # Text, sentence splitting and TTS run as one pipeline:
+                        # clips play back to back in one player while text streams
+                        live_audio = st.container()
+                        stream_id = uuid.uuid4().hex
+                        for event in speak_stream(chunks, stream_language, speak=speak):
+                            if event[0] == "text":
+                                explanation += event[1]
+                                render_explanation(output_box, explanation, final=False)
+                            else:
+                                clips.append(event[2])
+                                if event[2]:
+                                    if len(clips) == 1:
+                                        live_audio.caption("🔊 Reading aloud as the explanation is written...")
+                                    with live_audio:
+                                        queue_audio(event[2], stream_id, len(clips) - 1)
+                    else:
+                        for chunk in chunks:
+                            explanation += chunk
+                            render_explanation(output_box, explanation, final=False)
+                if follow_up:
+                    st.session_state.conversation = extend_conversation(
+                        st.session_state.conversation, follow_up, explanation)
+                else:
+                    st.session_state.conversation = start_conversation(
+                        stream_topic, explanation, stream_from_image)
+                st.session_state.explanation = explanation
+                st.session_state.current_topic = stream_topic
+                st.session_state.current_language = stream_language
+                st.session_state.simplified = stream_simplify
+
+                # Reuse the sentence clips as the full audio instead of synthesizing again
+                if clips:
+                    audio_bytes, audio_file = join_sentence_audio(explanation, stream_language, clips)
+                    if audio_bytes:
+                        keep_audio(audio_bytes, explanation)
+
+                # Speculatively prepare "Make Even Simpler" unless the pack already has it
+                # (prefetch calls Gemini from this process, so not in API client mode)
+                if not stream_simplify and not api_client and not (
+                    content_pack and content_pack.get_explanation(stream_topic, stream_language, True)
+                ):
+                    start_prefetch(st.session_state.session_id, st.session_state.conversation,
+                                   stream_language)
+            except Exception as e:
+                output_box.empty()
+                st.error(f"❌ Error: {str(e)}")
+                if not stream_simplify:
+                    st.info("Please try again or check your connection.")
+
+    if st.session_state.explanation:
+        # Display explanation
+        render_explanation(output_box, st.session_state.explanation)
+
+        # Audio player (automatic generation)
+        st.markdown("### 🔊 Listen to Explanation")
+
+        # Automatically generate and play audio when explanation changes
+        try:
+            # None if the store evicted it under memory pressure; fetched again below
+            audio_bytes = artifact_store.get(st.session_state.get("audio_ref"))
+            if (audio_bytes is None
+                    or st.session_state.get('last_explanation') != st.session_state.explanation):
+                st.info("🎵 Generating audio...")
+
+                # Prepare text for TTS (the full explanation is synthesized in chunks)
+                tts_text = prepare_tts_text(st.session_state.explanation)
+
+                # Use pre-synthesized audio from the content pack if available
+                audio_bytes, audio_file = None, None
+                if content_pack:
+                    audio_bytes = content_pack.get_audio(tts_text, st.session_state.current_language)
+
+                # Generate new audio
+                if not audio_bytes:
+                    audio_bytes, audio_file = speak(
+                        tts_text,
+                        st.session_state.current_language
+                    )
+                if audio_bytes:
+                    keep_audio(audio_bytes, st.session_state.explanation)
+                    st.success("✅ Audio generated successfully!")
+                else:
+                    st.warning("⚠️ Audio generation failed. This may be due to rate limiting.")
+                    st.info("🔄 Try again in a few minutes or use shorter text.")
+
+            # Play audio at normal speed
+            if audio_bytes:
+                play_audio(audio_bytes)
 
-        # Play audio at normal speed
-        if 'audio_bytes' in st.session_state:
-            play_audio(st.session_state.audio_bytes)
+        except Exception as e:
+            st.error(f"❌ Audio generation failed: {str(e)}")
+            st.info("💡 Try checking your internet connection or try a shorter text.")
 
-    except Exception as e:
-        st.error(f"❌ Audio generation failed: {str(e)}")
-        st.info("💡 Try checking your internet connection or try a shorter text.")
+        # Audio files belong to the shared audio cache (utils/audio_cache.py) and the
+        # bytes to the artifact store (utils/artifact_store.py); both are bounded by size
 
-    # Cleanup audio file when session ends or explanation changes
-    if 'audio_file' in st.session_state and st.session_state.get('last_explanation') != st.session_state.explanation:
-        try:
-            import os
-            if os.path.exists(st.session_state.audio_file):
-                os.remove(st.session_state.audio_file)
-        except:
-            pass  # Ignore cleanup errors
-    
-    # Additional info
-    if st.session_state.simplified:
-        st.success("✅ This is the simplified version")
-    else:
-        st.info("💡 Click 'Make Even Simpler' for an easier explanation")
+        # Additional info
+        if st.session_state.simplified:
+            st.success("✅ This is the simplified version")
+        else:
+            st.info("💡 Click 'Make Even Simpler' for an easier explanation")
+
+    with button_row:
+        action_buttons()
+
+output_section()
 
 # Footer
 st.markdown("---")
-st.markdown("""
-    <div style='text-align: center; color: #888888; padding: 20px;' class='footer-text'>
-        <p>💡 <strong>LocalLearn</strong> - Making science accessible in every language</p>
-        <p style='font-size: 0.9em;'>Powered by Google ADK Agent Architecture</p>
-    </div>
-""", unsafe_allow_html=True)
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)
@@ -33,17 +33,11 @@ def test_audio_generation():
                 print(f"   Audio bytes: {len(audio_bytes)} bytes")
                 print(f"   File exists: {os.path.exists(audio_file)}")
 
+                # The file belongs to the audio cache; leave it in place
                 if os.path.exists(audio_file):
                     file_size = os.path.getsize(audio_file)
                     print(f"   File size: {file_size} bytes")
 
-                    # Clean up
-                    try:
-                        os.remove(audio_file)
-                        print("   File cleaned up")
-                    except:
-                        print("   Could not clean up file")
-
             else:
                 print("❌ Failed: No audio data returned")
 
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test script to check topic canonicalization and fuzzy topic matching
+"""
+
+from utils.topic_index import TopicIndex, canonicalize_topic
+
+def test_topic_index():
+    print("🔍 Testing Topic Matching...")
+    print("=" * 50)
+
+    # (stored topic, asked topic, should share the stored answer)
+    test_cases = [
+        ("newtons first law", "Newton's 1st law", True),
+        ("newtons first law", "first law of newton", True),
+        ("newtons first law", "newton 2 law", False),
+        ("photosynthesis", "photosynthsis", True),
+        ("sexual reproduction", "sexual reproductoin", True),
+        # Opposite concepts that look alike letter by letter
+        ("sexual reproduction", "asexual reproduction", False),
+        ("aerobic respiration", "anaerobic respiration", False),
+        ("biotic factors", "abiotic factors", False),
+        ("hypertonic solution", "hypotonic solution", False),
+        ("endothermic reaction", "exothermic reaction", False),
+        ("organic compounds", "inorganic compounds", False),
+        ("renewable resources", "non renewable resources", False),
+        ("vertebrates", "invertebrates", False),
+    ]
+
+    failures = 0
+    for stored, asked, expected in test_cases:
+        for first, second in ((stored, asked), (asked, stored)):
+            index = TopicIndex(db_path=None)
+            index.add(canonicalize_topic(first), "Hindi")
+            match, score = index.lookup(second, "Hindi")
+            matched = match is not None
+            if matched == expected:
+                print(f"✅ {second!r} vs {first!r}: {'match' if matched else 'no match'}")
+            else:
+                failures += 1
+                print(f"❌ {second!r} vs {first!r}: expected {'a match' if expected else 'no match'}, "
+                      f"got {match!r} ({score:.2f})")
+
+    print("\n" + "=" * 50)
+    print(f"🧭 Topic matching test completed with {failures} failures")
+    assert failures == 0
+
+if __name__ == "__main__":
+    test_topic_index()
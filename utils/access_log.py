@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from utils.explanation_cache import normalize_topic
+from utils.metrics import get_logger, increment
+from utils.popularity import HeavyHitters
+
+logger = get_logger("access_log")
+
+# Record of what students actually ask for. Every explanation (ask_tutor,
+# ask_tutor_stream), follow-up (ask_follow_up_stream, claimed prefetches) and
+# TTS (speak_text) request is appended as one JSON line to an append-only log,
+# and explanation requests feed a streaming top-K of (topic, mode, follow-up)
+# per language. warm_cache.py replays the log to re-generate the
+# hottest answers and their audio before the school day starts.
+#
+# Background work (the speculative "Make Even Simpler" prefetch, cache
+# warming, content pack builds) is not a student request and is not recorded.
+ACCESS_LOG_PATH = os.path.expanduser(os.getenv(
+    "LOCALLEARN_ACCESS_LOG",
+    os.path.join(os.path.expanduser("~"), ".cache", "locallearn", "access.log"),
+))
+HOT_TOPICS = int(os.getenv("LOCALLEARN_HOT_TOPICS", "100"))  # tracked per language
+REPLAY_BYTES = 8 * 1024 * 1024  # only the tail of the log is replayed at start-up
+
+
+class AccessLog:
+    """Append-only JSON-lines request log with a per-language top-K of explanation requests."""
+
+    def __init__(self, path=ACCESS_LOG_PATH, k=HOT_TOPICS):
+        self.path = path
+        self.k = k
+        self.enabled = True
+        self._hot = {}  # language -> HeavyHitters of (topic key, simplify, follow-up kind)
+        self._file = None
+        self._loaded = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def record_explanation(self, topic, topic_key, language, simplify, follow_up=None):
+        """
+        Log an explanation request; topic is as asked, topic_key as cached.
+
+        follow_up ("simpler" or "example") marks a follow-up turn on the
+        explanation of topic rather than a fresh explanation.
+        """
+        entry = {"kind": "explanation", "language": language, "topic": topic,
+                 "topic_key": topic_key, "simplify": bool(simplify)}
+        if follow_up:
+            entry["follow_up"] = follow_up
+        self._record(entry)
+
+    def record_speech(self, language, chars, key):
+        """Log a TTS request for chars characters of text (key: its audio cache key)."""
+        self._record({"kind": "audio", "language": language, "chars": chars, "key": key[:16]})
+
+    @contextmanager
+    def paused(self):
+        """Requests made by this thread inside the block are not recorded."""
+        previous = getattr(self._local, "paused", False)
+        self._local.paused = True
+        try:
+            yield
+        finally:
+            self._local.paused = previous
+
+    def _record(self, entry):
+        if not self.enabled or getattr(self._local, "paused", False):
+            return
+        entry = dict(ts=round(time.time(), 3), **entry)
+        with self._lock:
+            self._load()
+            self._count(entry)
+            self._append(entry)
+        increment("access_log_total", kind=entry["kind"])
+
+    def _count(self, entry):
+        if entry.get("kind") != "explanation":
+            return
+        language = entry.get("language")
+        hot = self._hot.get(language)
+        if hot is None:
+            hot = self._hot[language] = HeavyHitters(self.k)
+        key = (entry.get("topic_key") or normalize_topic(entry.get("topic")), entry.get("simplify", False),
+               entry.get("follow_up") or "")  # "" sorts with the kinds in the heap
+        hot.add(key, payload=entry.get("topic"))
+
+    def _append(self, entry):
+        if not self.path:
+            return
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning("access_log_disabled", error=str(e))
+            self.path = None
+
+    def _load(self, since=None, max_bytes=REPLAY_BYTES):
+        """Replay the tail of the log into the top-K (once, on first use)."""
+        if self._loaded:
+            return
+        self._loaded = True
+        for entry in read_log(self.path, since=since, max_bytes=max_bytes):
+            self._count(entry)
+
+    def load(self, since=None, max_bytes=None):
+        """Rebuild the top-K from the log, counting only entries newer than since (a timestamp)."""
+        with self._lock:
+            self._hot.clear()
+            self._loaded = False
+            self._load(since=since, max_bytes=max_bytes)
+
+    def hottest(self, language=None, n=None):
+        """
+        The most requested explanations.
+
+        Returns:
+            [(topic, language, simplify, follow_up, estimated requests)], most
+            requested first, for one language or (n per language) for all of
+            them. follow_up is None for explanations asked from scratch.
+        """
+        with self._lock:
+            self._load()
+            languages = [language] if language else sorted(self._hot)
+            return [
+                (topic or topic_key, lang, simplify, follow_up or None, count)
+                for lang in languages if lang in self._hot
+                for (topic_key, simplify, follow_up), count, topic in self._hot[lang].top(n)
+            ]
+
+
+def read_log(path, since=None, max_bytes=None):
+    """Yield log entries in order, from the last max_bytes of the file and newer than since."""
+    if not path or not os.path.exists(path):
+        return
+    try:
+        with open(path, "rb") as f:
+            if max_bytes:
+                f.seek(0, os.SEEK_END)
+                start = max(0, f.tell() - max_bytes)
+                f.seek(start)
+                if start:
+                    f.readline()  # skip the partial first line
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+                if since is None or entry.get("ts", 0) >= since:
+                    yield entry
+    except OSError as e:
+        logger.warning("access_log_read_failed", error=str(e))
+
+
+# Shared log used by agents/tutor_agent.py and utils/audio_utils.py
+access_log = AccessLog()
@@ -0,0 +1,105 @@
+import codecs
+import json
+import os
+import urllib.error
+import urllib.request
+from utils.metrics import get_logger
+
+logger = get_logger("api_client")
+
+# Thin client for api_server.py. When LOCALLEARN_API_URL is set, main.py sends
+# explanation and TTS requests here instead of calling Gemini and gTTS from
+# the Streamlit server's own threads. Only the standard library is used, so
+# the UI process needs no extra dependencies.
+API_URL = os.getenv("LOCALLEARN_API_URL", "").rstrip("/")
+API_TIMEOUT = float(os.getenv("LOCALLEARN_API_TIMEOUT", "120"))
+
+
+class ApiClient:
+    """Call the LocalLearn HTTP API."""
+
+    def __init__(self, base_url, timeout=API_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _open(self, method, path, payload=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(
+            f"{self.base_url}{path}", data=data, method=method,
+            headers={"Content-Type": "application/json"} if data else {},
+        )
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            try:
+                detail = json.loads(e.read().decode("utf-8")).get("detail", e.reason)
+            except (ValueError, AttributeError):
+                detail = e.reason
+            # Keep the status in the message so rate limits are recognised (429)
+            raise Exception(f"API error {e.code}: {detail}")
+        except urllib.error.URLError as e:
+            raise Exception(f"API connection error: {e.reason}")
+
+    def _json(self, method, path, payload=None):
+        with self._open(method, path, payload) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+    def explain(self, topic, language="Kannada", simplify=False, extracted_from_image=False):
+        """Same contract as ask_tutor."""
+        result = self._json("POST", "/explain", {
+            "topic": topic, "language": language, "simplify": simplify,
+            "extracted_from_image": extracted_from_image,
+        })
+        return result["explanation"]
+
+    def explain_stream(self, topic, language="Kannada", simplify=False, extracted_from_image=False):
+        """Same contract as ask_tutor_stream: yields text as the server sends it."""
+        return self._stream("/explain/stream", {
+            "topic": topic, "language": language, "simplify": simplify,
+            "extracted_from_image": extracted_from_image,
+        })
+
+    def follow_up_stream(self, conversation, language="Kannada", kind="simpler"):
+        """Same contract as ask_follow_up_stream."""
+        return self._stream("/follow-up/stream", {
+            "conversation": list(conversation), "language": language, "kind": kind,
+        })
+
+    def _stream(self, path, payload):
+        """Yield the response text of a streaming endpoint as it arrives."""
+        response = self._open("POST", path, payload)
+        # Multi-byte characters (Indic scripts) can be split across reads
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        with response:
+            while True:
+                try:
+                    data = response.read1(4096)
+                except Exception as e:
+                    raise Exception(f"API stream interrupted: {e}")
+                if not data:
+                    break
+                text = decoder.decode(data)
+                if text:
+                    yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def speak(self, text, language="Kannada"):
+        """
+        Same contract as speak_text.
+
+        Returns:
+            (audio_bytes, None): audio is cached by the service, not locally
+        """
+        try:
+            result = self._json("POST", "/speak", {"text": text, "language": language})
+            with self._open("GET", f"/audio/{result['audio_id']}") as response:
+                return response.read(), None
+        except Exception as e:
+            logger.warning("api_speak_failed", language=language, error=str(e))
+            return None, None
+
+
+# Shared client used by main.py, or None when the app calls the services itself
+api_client = ApiClient(API_URL) if API_URL else None
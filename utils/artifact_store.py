@@ -0,0 +1,223 @@
+import glob
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from utils.audio_cache import audio_cache
+from utils.metrics import get_logger, increment
+
+logger = get_logger("artifact_store")
+
+# Shared store for per-session artifacts (the audio of the current explanation).
+# Sessions keep only the content hash ("ref") in st.session_state; the bytes
+# live here once per process however many sessions hold them. Each session
+# holds at most one ref per slot, so replacing a session's audio releases the
+# old clip. Memory is bounded by bytes: unreferenced artifacts are evicted
+# first, then the least recently used referenced ones, whose sessions simply
+# fetch the audio again (normally a hit in the audio cache).
+#
+# Streamlit does not report when a session ends, so sessions that have not
+# rerun for SESSION_IDLE_TTL seconds are released by a background reaper.
+# The reaper also deletes temp files left behind by TTS: tts_*.mp3 from older
+# versions, tts_offline_*.wav from an offline worker that was killed mid-job,
+# and half-written *.tmp files in the audio cache directory.
+ARTIFACT_MEMORY_BYTES = int(float(os.getenv("LOCALLEARN_ARTIFACT_MEMORY_MB", "128")) * 1024 * 1024)
+SESSION_IDLE_TTL = float(os.getenv("LOCALLEARN_SESSION_IDLE_TTL", "3600"))
+REAPER_INTERVAL = float(os.getenv("LOCALLEARN_REAPER_INTERVAL", "300"))
+TEMP_FILE_MAX_AGE = float(os.getenv("LOCALLEARN_TEMP_FILE_MAX_AGE", "900"))
+
+TEMP_FILE_PATTERNS = ("tts_*.mp3", "tts_offline_*.wav")
+
+
+def artifact_ref(data):
+    """Content hash identifying artifact bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ArtifactStore:
+    """Reference-counted, byte-bounded store of artifact bytes keyed by content hash."""
+
+    def __init__(self, memory_bytes=ARTIFACT_MEMORY_BYTES, session_ttl=SESSION_IDLE_TTL):
+        self.memory_bytes = memory_bytes
+        self.session_ttl = session_ttl
+        self._data = OrderedDict()  # ref -> bytes, least recently used first
+        self._refcounts = {}  # ref -> number of (owner, slot) holders
+        self._size = 0
+        self._owners = {}  # owner -> {"slots": {slot: ref}, "seen": last activity}
+        self._lock = threading.Lock()
+
+    def put(self, data, owner=None, slot=None):
+        """
+        Store artifact bytes, optionally as owner's artifact for slot.
+
+        Returns:
+            The artifact's ref, or None for empty data
+        """
+        if not data:
+            return None
+        ref = artifact_ref(data)
+        with self._lock:
+            if ref in self._data:
+                self._data.move_to_end(ref)
+                increment("artifacts_total", result="deduplicated")
+            else:
+                self._data[ref] = data
+                self._size += len(data)
+                increment("artifacts_total", result="stored")
+            if owner is not None and slot is not None:
+                self._assign(owner, slot, ref)
+            self._evict()
+        return ref
+
+    def get(self, ref):
+        """Bytes for ref, or None if it is unknown or was evicted."""
+        if not ref:
+            return None
+        with self._lock:
+            data = self._data.get(ref)
+            if data is not None:
+                self._data.move_to_end(ref)
+            return data
+
+    def touch(self, owner):
+        """Mark owner (a session) as active so the reaper keeps its artifacts."""
+        with self._lock:
+            self._owner(owner)["seen"] = time.time()
+
+    def release(self, owner, slot=None):
+        """Drop owner's hold on slot, or on all of its artifacts if slot is None."""
+        with self._lock:
+            entry = self._owners.get(owner)
+            if entry is None:
+                return
+            slots = list(entry["slots"]) if slot is None else [slot]
+            for name in slots:
+                self._decref(entry["slots"].pop(name, None))
+            if slot is None:
+                del self._owners[owner]
+
+    def stats(self):
+        """Current size of the store."""
+        with self._lock:
+            return {
+                "artifacts": len(self._data),
+                "bytes": self._size,
+                "referenced": len(self._refcounts),
+                "owners": len(self._owners),
+            }
+
+    def _owner(self, owner):
+        entry = self._owners.get(owner)
+        if entry is None:
+            entry = self._owners[owner] = {"slots": {}, "seen": time.time()}
+        return entry
+
+    def _assign(self, owner, slot, ref):
+        entry = self._owner(owner)
+        entry["seen"] = time.time()
+        previous = entry["slots"].get(slot)
+        if previous == ref:
+            return
+        entry["slots"][slot] = ref
+        self._refcounts[ref] = self._refcounts.get(ref, 0) + 1
+        self._decref(previous)
+
+    def _decref(self, ref):
+        if ref is None or ref not in self._refcounts:
+            return
+        self._refcounts[ref] -= 1
+        if self._refcounts[ref] <= 0:
+            del self._refcounts[ref]
+
+    def _evict(self):
+        if self._size <= self.memory_bytes:
+            return
+        # Unreferenced artifacts go first, oldest first
+        for ref in [ref for ref in self._data if ref not in self._refcounts]:
+            if self._size <= self.memory_bytes:
+                return
+            self._size -= len(self._data.pop(ref))
+            increment("artifacts_total", result="evicted")
+        # Still over budget: drop the least recently used held artifacts
+        while self._size > self.memory_bytes and len(self._data) > 1:
+            ref, data = self._data.popitem(last=False)
+            self._size -= len(data)
+            increment("artifacts_total", result="evicted_referenced")
+
+    def reap_sessions(self, now=None):
+        """Release sessions idle for longer than session_ttl. Returns how many were released."""
+        now = now or time.time()
+        with self._lock:
+            idle = [owner for owner, entry in self._owners.items()
+                    if now - entry["seen"] > self.session_ttl]
+        for owner in idle:
+            self.release(owner)
+        if idle:
+            increment("sessions_reaped_total", amount=len(idle))
+        return len(idle)
+
+
+def reap_temp_files(max_age=TEMP_FILE_MAX_AGE, now=None):
+    """
+    Delete orphaned TTS temp files older than max_age seconds.
+
+    Returns:
+        Number of files removed
+    """
+    now = now or time.time()
+    candidates = [
+        ("tts", path)
+        for pattern in TEMP_FILE_PATTERNS
+        for path in glob.glob(os.path.join(tempfile.gettempdir(), pattern))
+    ]
+    if audio_cache.cache_dir:
+        candidates += [("audio_cache", path)
+                       for path in glob.glob(os.path.join(audio_cache.cache_dir, "*.tmp"))]
+
+    removed = 0
+    for kind, path in candidates:
+        try:
+            if now - os.stat(path).st_mtime < max_age:
+                continue
+            os.remove(path)
+        except OSError:
+            # In use, already gone, or not ours to delete
+            continue
+        removed += 1
+        increment("temp_files_reaped_total", kind=kind)
+    return removed
+
+
+def _reap_forever(store, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            sessions = store.reap_sessions()
+            files = reap_temp_files()
+            if sessions or files:
+                logger.info("reaped", sessions=sessions, temp_files=files, **store.stats())
+        except Exception as e:
+            logger.warning("reaper_failed", error=str(e))
+
+
+_reaper = None
+_reaper_lock = threading.Lock()
+
+
+def start_reaper(store=None, interval=REAPER_INTERVAL):
+    """Reap idle sessions and orphaned temp files in a background thread (once per process)."""
+    global _reaper
+    if interval <= 0:
+        return None
+    with _reaper_lock:
+        if _reaper is None:
+            _reaper = threading.Thread(target=_reap_forever, args=(store or artifact_store, interval),
+                                       name="artifact-reaper", daemon=True)
+            _reaper.start()
+    return _reaper
+
+
+# Shared store used by main.py
+artifact_store = ArtifactStore()
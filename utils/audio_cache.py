@@ -0,0 +1,202 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from utils.metrics import get_logger, increment
+from utils.popularity import cache_policy
+
+logger = get_logger("audio_cache")
+
+# Content-addressed cache for synthesized speech:
+#   1. In-memory LRU bounded by bytes
+#   2. Files on disk bounded by bytes, evicted least recently used first
+# Entries are keyed on a hash of (engine, language code, text), so identical
+# text is only ever synthesized once per engine. With a popularity policy
+# (utils/popularity.py) both tiers evict by request frequency instead of pure
+# recency, and the memory tier only admits clips at least as popular as the
+# one they would replace.
+AUDIO_CACHE_DIR = os.getenv(
+    "LOCALLEARN_AUDIO_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "locallearn", "audio"),
+)
+AUDIO_CACHE_MEMORY_BYTES = int(float(os.getenv("LOCALLEARN_AUDIO_CACHE_MEMORY_MB", "64")) * 1024 * 1024)
+AUDIO_CACHE_DISK_BYTES = int(float(os.getenv("LOCALLEARN_AUDIO_CACHE_DISK_MB", "512")) * 1024 * 1024)
+TYPICAL_CLIP_BYTES = 256 * 1024  # sizes the popularity sketch for a byte budget
+
+EXTENSIONS = {"gtts": "mp3", "pyttsx3": "wav"}
+
+
+def audio_cache_key(text, lang_code, engine):
+    """Content hash identifying the audio for text spoken by engine in lang_code."""
+    raw = "\x1f".join([engine, lang_code, text])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Byte-bounded memory cache in front of a byte-bounded directory of audio files."""
+
+    def __init__(self, cache_dir=AUDIO_CACHE_DIR, memory_bytes=AUDIO_CACHE_MEMORY_BYTES,
+                 disk_bytes=AUDIO_CACHE_DISK_BYTES, policy=None):
+        self.cache_dir = cache_dir
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.policy = policy
+        self._memory = OrderedDict()  # key -> audio bytes
+        self._memory_size = 0
+        self._disk = None  # key -> (path, size), least recently used first
+        self._disk_size = 0
+        self._lock = threading.Lock()
+
+    def _load_disk_index(self):
+        """Scan the cache directory once, ordering existing files by last access."""
+        if self._disk is not None or not self.cache_dir:
+            return
+        self._disk = OrderedDict()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                key, _, ext = name.partition(".")
+                if ext not in EXTENSIONS.values():
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, key, path, stat.st_size))
+            for _, key, path, size in sorted(entries):
+                self._disk[key] = (path, size)
+                self._disk_size += size
+        except OSError as e:
+            logger.warning("audio_disk_cache_disabled", error=str(e))
+            self.cache_dir = None
+
+    def path_for(self, key, engine):
+        """Disk path for a cache entry, or None if the disk tier is disabled."""
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, f"{key}.{EXTENSIONS.get(engine, 'bin')}")
+
+    def get(self, key):
+        """
+        Look up cached audio.
+
+        Returns:
+            (audio_bytes, file_path) on a hit, (None, None) on a miss. file_path
+            is None if the disk tier is disabled.
+        """
+        with self._lock:
+            if self.policy:
+                self.policy.record(key)
+            self._load_disk_index()
+            disk_entry = self._disk.get(key) if self._disk is not None else None
+
+            audio_bytes = self._memory.get(key)
+            if audio_bytes is not None:
+                self._memory.move_to_end(key)
+                if disk_entry is not None:
+                    self._disk.move_to_end(key)
+                increment("cache_requests_total", cache="audio", result="memory_hit")
+                return audio_bytes, disk_entry[0] if disk_entry else None
+
+            if disk_entry is None:
+                disk_entry = self._adopt_disk_file(key)
+            if disk_entry is None:
+                increment("cache_requests_total", cache="audio", result="miss")
+                return None, None
+
+            path = disk_entry[0]
+            try:
+                with open(path, "rb") as f:
+                    audio_bytes = f.read()
+                os.utime(path)
+            except OSError:
+                # File was removed behind our back
+                self._forget_disk(key)
+                increment("cache_requests_total", cache="audio", result="miss")
+                return None, None
+
+            self._disk.move_to_end(key)
+            self._remember(key, audio_bytes)
+            increment("cache_requests_total", cache="audio", result="disk_hit")
+            return audio_bytes, path
+
+    def _adopt_disk_file(self, key):
+        """Index a file another process (e.g. another API worker) wrote after our scan."""
+        if self._disk is None:
+            return None
+        for engine in EXTENSIONS:
+            path = self.path_for(key, engine)
+            try:
+                size = os.stat(path).st_size
+            except OSError:
+                continue
+            self._disk[key] = (path, size)
+            self._disk_size += size
+            return path, size
+        return None
+
+    def put(self, key, engine, audio_bytes):
+        """
+        Store audio in both tiers.
+
+        Returns:
+            Path of the cached file, or None if the disk tier is disabled
+        """
+        with self._lock:
+            self._load_disk_index()
+            self._remember(key, audio_bytes)
+
+            path = self.path_for(key, engine)
+            if path is None:
+                return None
+            try:
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(audio_bytes)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning("audio_disk_cache_write_failed", error=str(e))
+                return None
+
+            self._forget_disk(key)
+            self._disk[key] = (path, len(audio_bytes))
+            self._disk_size += len(audio_bytes)
+            self._evict_disk(keep=key)
+            return path
+
+    def _remember(self, key, audio_bytes):
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key))
+        if len(audio_bytes) > self.memory_bytes:
+            return
+        if self.policy and self._memory_size + len(audio_bytes) > self.memory_bytes:
+            if not self.policy.admit(key, self.policy.victim(self._memory)):
+                increment("cache_admissions_rejected_total", cache="audio")
+                return
+        self._memory[key] = audio_bytes
+        self._memory_size += len(audio_bytes)
+        while self._memory_size > self.memory_bytes:
+            self._memory_size -= len(self._memory.pop(self._victim(self._memory, key)))
+
+    def _victim(self, entries, keep):
+        """Next entry to evict: the policy's pick, else the least recently used."""
+        if self.policy:
+            return self.policy.victim(entries, exclude=keep)
+        return next(iter(entries))
+
+    def _forget_disk(self, key):
+        entry = self._disk.pop(key, None)
+        if entry is not None:
+            self._disk_size -= entry[1]
+
+    def _evict_disk(self, keep=None):
+        while self._disk_size > self.disk_bytes and len(self._disk) > 1:
+            path, size = self._disk.pop(self._victim(self._disk, keep))
+            self._disk_size -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# Shared cache instance used by utils/audio_utils.py
+audio_cache = AudioCache(policy=cache_policy(AUDIO_CACHE_MEMORY_BYTES // TYPICAL_CLIP_BYTES))
@@ -0,0 +1,139 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from utils.access_log import access_log
+from utils.audio_cache import audio_cache, audio_cache_key
+from utils.audio_utils import (
+    LANG_CODES, SENTENCE_END_RE, TTS_CHUNK_CHARS, TTS_MAX_WORKERS, concat_mp3, prepare_tts_text,
+    speak_text,
+)
+from utils.metrics import get_logger
+
+logger = get_logger("audio_pipeline")
+
+# Progressive audio: text chunks streamed from Gemini are split into sentences
+# as they arrive and queued for TTS, and the audio is handed back in order as
+# soon as it is ready. The first sentence is synthesized on its own so it can
+# play while the rest is still being generated; later sentences are grouped
+# into clips of up to TTS_CHUNK_CHARS to keep the number of TTS requests down.
+# The clips are one student request, so they are logged once for the whole
+# text rather than per clip.
+#
+# Sentences get their own pool because speak_text may itself fan out long
+# sentences onto the chunked-synthesis pool in audio_utils.
+_pipeline_pool = ThreadPoolExecutor(max_workers=TTS_MAX_WORKERS, thread_name_prefix="tts-stream")
+
+
+class SentenceSplitter:
+    """Incrementally split streamed text into complete sentences."""
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, text):
+        """Add text and return the sentences it completed."""
+        self._buffer += text
+        parts = SENTENCE_END_RE.split(self._buffer)
+        # The last part is still open until a sentence end follows it
+        self._buffer = parts.pop()
+        return [part.strip() for part in parts if part.strip()]
+
+    def flush(self):
+        """Return whatever text is left once the stream has ended."""
+        remainder, self._buffer = self._buffer.strip(), ""
+        return [remainder] if remainder else []
+
+
+def _speak_sentence(speak, sentence, language):
+    with access_log.paused():
+        audio_bytes, audio_file = speak(prepare_tts_text(sentence), language)
+    return audio_bytes
+
+
+def speak_stream(text_chunks, language="Kannada", speak=speak_text, max_chars=TTS_CHUNK_CHARS):
+    """
+    Pipeline streamed text through sentence splitting and TTS.
+
+    Args:
+        text_chunks: Iterable of text chunks, e.g. from ask_tutor_stream
+        language: Language to speak in
+        speak: Function with the speak_text contract used for each clip
+        max_chars: Sentences after the first are grouped into clips of up to
+            this many characters
+
+    Yields:
+        ("text", chunk) for every chunk as soon as it arrives, and
+        ("audio", clip_text, audio_bytes) for every clip in order as soon
+        as its audio is ready. audio_bytes is None if synthesis failed.
+    """
+    splitter = SentenceSplitter()
+    pending = deque()
+    group = []
+    submitted = False
+    parts = []
+
+    def send(text):
+        nonlocal submitted
+        submitted = True
+        pending.append((text, _pipeline_pool.submit(_speak_sentence, speak, text, language)))
+
+    def submit(sentences, final=False):
+        for sentence in sentences:
+            if not submitted:
+                # First sound as early as possible
+                send(sentence)
+                continue
+            if group and len(" ".join(group)) + 1 + len(sentence) > max_chars:
+                send(" ".join(group))
+                group.clear()
+            group.append(sentence)
+        if final and group:
+            send(" ".join(group))
+            group.clear()
+
+    def result(future):
+        try:
+            return future.result()
+        except Exception as e:
+            logger.warning("sentence_tts_failed", error=str(e))
+            return None
+
+    try:
+        for chunk in text_chunks:
+            yield ("text", chunk)
+            parts.append(chunk)
+            submit(splitter.feed(chunk))
+            # Hand over finished audio without waiting for the rest of the text
+            while pending and pending[0][1].done():
+                sentence, future = pending.popleft()
+                yield ("audio", sentence, result(future))
+
+        submit(splitter.flush(), final=True)
+        text = prepare_tts_text("".join(parts).strip())
+        if text:
+            access_log.record_speech(language, len(text),
+                                     audio_cache_key(text, LANG_CODES.get(language, "en"), "gtts"))
+        while pending:
+            sentence, future = pending.popleft()
+            yield ("audio", sentence, result(future))
+    finally:
+        # The consumer stopped early or the text stream failed
+        for sentence, future in pending:
+            future.cancel()
+
+
+def join_sentence_audio(explanation, language, clips):
+    """
+    Join the MP3 clips from speak_stream into the audio for the whole explanation.
+
+    The joined clip is stored in the audio cache under the full explanation
+    text, so later plays of the same explanation skip synthesis entirely.
+
+    Returns:
+        (audio_bytes, audio_file), or (None, None) if any clip is missing or
+        is not MP3 (e.g. came from the offline WAV fallback)
+    """
+    if not clips or any(not clip or clip[:4] == b"RIFF" for clip in clips):
+        return None, None
+    audio_bytes = concat_mp3(clips)
+    cache_key = audio_cache_key(prepare_tts_text(explanation), LANG_CODES.get(language, "en"), "gtts")
+    return audio_bytes, audio_cache.put(cache_key, "gtts", audio_bytes)
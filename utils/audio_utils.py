@@ -1,15 +1,19 @@
-from gtts import gTTS
 import streamlit as st
+import base64
+import importlib.util
+import io
+import json
 import os
-import uuid
-import tempfile
+import re
+from concurrent.futures import ThreadPoolExecutor
+from utils.access_log import access_log
+from utils.audio_cache import audio_cache, audio_cache_key
+from utils.metrics import get_logger, increment, timed
+from utils.offline_tts_worker import OfflineTTSWorker
+from utils.rate_limit import gtts_upstream, is_rate_limit_error
+from utils.single_flight import audio_flight
 
-# Try to import offline TTS as fallback
-try:
-    import pyttsx3
-    OFFLINE_TTS_AVAILABLE = True
-except ImportError:
-    OFFLINE_TTS_AVAILABLE = False
+logger = get_logger("audio")
 
 LANG_CODES = {
     "Kannada":"kn", "Hindi":"hi", "Tamil":"ta", "Telugu":"te", "Malayalam":"ml",
@@ -17,43 +21,138 @@ LANG_CODES = {
     "English":"en"
 }
 
+# One offline TTS process per server, started on the first fallback
+offline_tts_worker = OfflineTTSWorker(LANG_CODES)
+_offline_tts_available = None
+
+# Chunked synthesis: long text is split on sentence boundaries and the chunks
+# are synthesized concurrently, then joined into a single MP3 stream
+TTS_CHUNK_CHARS = int(os.getenv("LOCALLEARN_TTS_CHUNK_CHARS", "300"))
+TTS_MAX_WORKERS = int(os.getenv("LOCALLEARN_TTS_WORKERS", "4"))
+
+# Sentence ends: Latin . ! ? need trailing whitespace (so "3.14" stays whole);
+# Devanagari danda/double danda and the Urdu full stop / question mark split anyway
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+|(?<=[।॥۔؟])\s*')
+
+_tts_pool = ThreadPoolExecutor(max_workers=TTS_MAX_WORKERS, thread_name_prefix="tts")
+
+def prepare_tts_text(text):
+    """Prepare explanation text for TTS (clean)."""
+    return text.replace('\n', ' ').replace('\r', ' ')  # Remove line breaks
+
+def split_sentences(text):
+    """Split text into sentences, including Indic sentence punctuation."""
+    return [sentence.strip() for sentence in SENTENCE_END_RE.split(text) if sentence.strip()]
+
+def chunk_text(text, max_chars=TTS_CHUNK_CHARS):
+    """
+    Group sentences into chunks of at most max_chars for parallel synthesis.
+
+    Sentences longer than max_chars are split at word boundaries.
+    """
+    chunks = []
+    current = ""
+    for sentence in split_sentences(text):
+        pieces = [sentence]
+        if len(sentence) > max_chars:
+            pieces, piece = [], ""
+            for word in sentence.split():
+                if piece and len(piece) + 1 + len(word) > max_chars:
+                    pieces.append(piece)
+                    piece = word
+                else:
+                    piece = f"{piece} {word}" if piece else word
+            if piece:
+                pieces.append(piece)
+
+        for piece in pieces:
+            if current and len(current) + 1 + len(piece) > max_chars:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _strip_id3(data):
+    """Remove a leading ID3v2 tag so MP3 chunks can be concatenated frame to frame."""
+    if len(data) >= 10 and data[:3] == b"ID3":
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        return data[10 + size:]
+    return data
+
+def _synthesize_chunk(text, lang_code):
+    """Synthesize one chunk with gTTS into an in-memory buffer."""
+    # Imported on first synthesis rather than at app start-up
+    from gtts import gTTS
+
+    def synthesize():
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang_code, slow=False).write_to_fp(buffer)
+        return buffer.getvalue()
+
+    # Rate limited, retried with backoff and circuit-broken per process
+    return gtts_upstream.call(synthesize)
+
+def synthesize_chunked(text, lang_code):
+    """
+    Synthesize text of any length as one MP3 stream.
+
+    The text is split into sentence chunks which are synthesized concurrently
+    on a bounded worker pool; the resulting MP3 frames are concatenated in order.
+    """
+    chunks = chunk_text(text)
+    if len(chunks) == 1:
+        return _synthesize_chunk(chunks[0], lang_code)
+    parts = list(_tts_pool.map(lambda chunk: _synthesize_chunk(chunk, lang_code), chunks))
+    return concat_mp3(parts)
+
+def concat_mp3(parts):
+    """Join MP3 clips into one stream, keeping only the first clip's ID3 tag."""
+    return parts[0] + b"".join(_strip_id3(part) for part in parts[1:])
+
+def offline_tts_available():
+    """
+    True if pyttsx3 is installed.
+
+    Probed on the first fallback instead of at import time; the module itself
+    is only ever imported inside the offline TTS worker process.
+    """
+    global _offline_tts_available
+    if _offline_tts_available is None:
+        _offline_tts_available = importlib.util.find_spec("pyttsx3") is not None
+    return _offline_tts_available
+
 def speak_text_offline(text, language="Kannada"):
     """Generate audio using offline TTS (pyttsx3) as fallback."""
-    if not OFFLINE_TTS_AVAILABLE:
+    if not offline_tts_available():
         return None, None
 
     try:
         if not text or not text.strip():
             return None, None
 
-        # Create a unique temporary file
-        temp_dir = tempfile.gettempdir()
-        audio_file = os.path.join(temp_dir, f"tts_offline_{uuid.uuid4().hex}.wav")
-
-        # Initialize offline TTS engine
-        engine = pyttsx3.init()
-
-        # Set language/voice if possible (limited support)
-        voices = engine.getProperty('voices')
-        if language == "English":
-            # Try to find English voice
-            for voice in voices:
-                if 'english' in voice.name.lower() or 'en' in voice.name.lower():
-                    engine.setProperty('voice', voice.id)
-                    break
-
-        # Generate and save audio
-        engine.save_to_file(text, audio_file)
-        engine.runAndWait()
-
-        # Read audio bytes
-        if os.path.exists(audio_file):
-            with open(audio_file, "rb") as f:
-                audio_bytes = f.read()
-            return audio_bytes, audio_file
+        # Reuse audio previously synthesized for the same text
+        cache_key = audio_cache_key(text, LANG_CODES.get(language, "en"), "pyttsx3")
+        cached_bytes, cached_file = audio_cache.get(cache_key)
+        if cached_bytes:
+            return cached_bytes, cached_file
+
+        def synthesize():
+            # Synthesize in the shared worker process that keeps pyttsx3 warm
+            with timed("tts", engine="pyttsx3"):
+                audio_bytes = offline_tts_worker.synthesize(text, language)
+            if not audio_bytes:
+                return None, None
+            return audio_bytes, audio_cache.put(cache_key, "pyttsx3", audio_bytes)
+
+        # Identical concurrent requests share one synthesis
+        return audio_flight.do(cache_key, synthesize)
 
     except Exception as e:
-        print(f"DEBUG: Offline TTS failed: {str(e)}")
+        logger.warning("offline_tts_failed", language=language, error=str(e))
+        increment("errors_total", component="offline_tts", kind="synthesis")
 
     return None, None
 
@@ -61,51 +160,49 @@ def speak_text(text, language="Kannada"):
     """Generate and return audio data from text using gTTS with offline fallback."""
     try:
         if not text or not text.strip():
-            print("DEBUG: No text provided for audio generation")
+            logger.debug("tts_skipped_empty_text")
             return None, None
 
         lang_code = LANG_CODES.get(language, "en")
-        print(f"DEBUG: Generating audio for language: {language} -> {lang_code}")
-        print(f"DEBUG: Text length: {len(text)} characters")
-
-        # Create a unique temporary file to avoid conflicts
-        temp_dir = tempfile.gettempdir()
-        audio_file = os.path.join(temp_dir, f"tts_{uuid.uuid4().hex}.mp3")
-        print(f"DEBUG: Audio file path: {audio_file}")
+        logger.debug("tts_requested", language=language, lang_code=lang_code, chars=len(text))
 
-        # Generate TTS
-        print("DEBUG: Creating gTTS object...")
-        tts = gTTS(text=text, lang=lang_code, slow=False)
-        print("DEBUG: Saving audio file...")
-        tts.save(audio_file)
+        # Reuse audio previously synthesized for the same text
+        cache_key = audio_cache_key(text, lang_code, "gtts")
+        access_log.record_speech(language, len(text), cache_key)
+        cached_bytes, cached_file = audio_cache.get(cache_key)
+        if cached_bytes:
+            logger.debug("tts_cache_hit", key=cache_key[:12])
+            return cached_bytes, cached_file
 
-        # Verify file was created
-        if not os.path.exists(audio_file):
-            raise Exception(f"Audio file was not created: {audio_file}")
+        def synthesize():
+            # Generate TTS straight into memory, sentence chunks in parallel
+            with timed("tts", engine="gtts"):
+                audio_bytes = synthesize_chunked(text, lang_code)
 
-        file_size = os.path.getsize(audio_file)
-        print(f"DEBUG: Audio file size: {file_size} bytes")
+            if not audio_bytes:
+                raise Exception("Audio file is empty")
 
-        if file_size == 0:
-            raise Exception("Audio file is empty")
-
-        # Read audio bytes
-        print("DEBUG: Reading audio bytes...")
-        with open(audio_file, "rb") as f:
-            audio_bytes = f.read()
+            # Store in the audio cache; the cached file stands in for the old temp file
+            audio_file = audio_cache.put(cache_key, "gtts", audio_bytes)
+            logger.debug("tts_synthesized", key=cache_key[:12], bytes=len(audio_bytes))
+            return audio_bytes, audio_file
 
-        print(f"DEBUG: Audio bytes length: {len(audio_bytes)}")
-        return audio_bytes, audio_file
+        # Identical concurrent requests share one synthesis
+        return audio_flight.do(cache_key, synthesize)
 
     except Exception as e:
-        print(f"DEBUG: Exception in speak_text: {str(e)}")
+        logger.warning("tts_failed", language=language, error=str(e))
         error_msg = str(e).lower()
+        rate_limited = is_rate_limit_error(e)
+        increment("errors_total", component="gtts", kind="rate_limit" if rate_limited else "synthesis")
 
-        if "429" in error_msg or "too many requests" in error_msg:
+        # Throttled, or the circuit breaker is open: go straight to offline TTS
+        if rate_limited:
             st.warning("⚠️ Google TTS is rate-limited. Trying offline TTS...")
             # Try offline TTS as fallback
             offline_result = speak_text_offline(text, language)
             if offline_result[0]:
+                increment("tts_fallback_total", reason="rate_limit")
                 st.info("✅ Using offline TTS (limited language support)")
                 return offline_result
             else:
@@ -115,6 +212,7 @@ def speak_text(text, language="Kannada"):
             st.warning("⚠️ Network error. Trying offline TTS...")
             offline_result = speak_text_offline(text, language)
             if offline_result[0]:
+                increment("tts_fallback_total", reason="network")
                 st.info("✅ Using offline TTS (English only)")
                 return offline_result
             else:
@@ -125,38 +223,80 @@ def speak_text(text, language="Kannada"):
         # Return None to indicate failure
         return None, None
 
+def audio_format(audio_bytes):
+    """MIME type of synthesized audio (gTTS gives MP3, the offline fallback WAV)."""
+    return "audio/wav" if audio_bytes[:4] == b"RIFF" else "audio/mp3"
+
 def play_audio(audio_bytes):
-    """Play audio using HTML audio player."""
+    """
+    Play audio with Streamlit's audio player.
+
+    st.audio registers the bytes with Streamlit's media file manager, which
+    serves them from a URL derived from the content hash. Reruns only resend
+    that URL, and the browser can cache the clip. Dark-theme styling for the
+    player lives in the theme CSS in utils/theme.py.
+    """
     if audio_bytes:
-        print(f"DEBUG: Playing audio, bytes length: {len(audio_bytes)}")
-        # Create data URL for the audio
-        import base64
-        audio_base64 = base64.b64encode(audio_bytes).decode()
-        print(f"DEBUG: Base64 encoded length: {len(audio_base64)}")
-
-        # HTML audio player with dark theme styling
-        audio_html = f"""
-        <audio id="tts-audio" controls style="width: 100%; background-color: #1a1a1a; border: 1px solid #444; border-radius: 5px; padding: 5px;">
-            <source src="data:audio/mp3;base64,{audio_base64}" type="audio/mp3">
-            Your browser does not support the audio element.
-        </audio>
-        <style>
-        audio {{
-            filter: invert(0.9);
-        }}
-        audio::-webkit-media-controls-panel {{
-            background-color: #1a1a1a !important;
-        }}
-        audio::-webkit-media-controls-current-time-display,
-        audio::-webkit-media-controls-time-remaining-display {{
-            color: #ffffff !important;
-        }}
-        </style>
-        """
-
-        st.markdown(audio_html, unsafe_allow_html=True)
-        print("DEBUG: Audio player HTML rendered")
+        with timed("audio_render"):
+            st.audio(audio_bytes, format=audio_format(audio_bytes))
         return True
     else:
-        print("DEBUG: No audio bytes to play")
+        logger.debug("audio_play_skipped_empty")
         return False
+
+# Clips of a streamed explanation play back to back in one hidden player
+# owned by the page (not by a component, which Streamlit may remove on the
+# next rerun). Each clip is handed over by a zero-height component that adds
+# it to the page's queue by index; when a clip ends the next one starts, so
+# only the first clip relies on the autoplay allowed by the button click.
+# A new stream id stops the previous explanation's clips.
+_AUDIO_QUEUE_JS = """
+window.__localLearnAudio = window.__localLearnAudio || (function () {
+  var player = new Audio(), stream = null, clips = [], next = 0, playing = false;
+  function advance() {
+    if (playing || !clips[next]) return;
+    playing = true;
+    player.src = clips[next];
+    next += 1;
+    player.play().catch(function () { playing = false; });
+  }
+  player.addEventListener("ended", function () { playing = false; advance(); });
+  return {
+    enqueue: function (id, index, src) {
+      if (id !== stream) {
+        player.pause();
+        stream = id; clips = []; next = 0; playing = false;
+      }
+      clips[index] = src;
+      advance();
+    }
+  };
+})();
+"""
+
+_AUDIO_QUEUE_HTML = """<script>
+var host = window.parent;
+if (!host.__localLearnAudio) {
+  var script = host.document.createElement("script");
+  script.textContent = %(queue_js)s;
+  host.document.head.appendChild(script);
+}
+host.__localLearnAudio.enqueue(%(stream)s, %(index)d, %(src)s);
+</script>"""
+
+
+def queue_audio(audio_bytes, stream_id, index):
+    """Append clip number index of stream stream_id to the page's sequential player."""
+    src = f"data:{audio_format(audio_bytes)};base64,{base64.b64encode(audio_bytes).decode('ascii')}"
+    html = _AUDIO_QUEUE_HTML % {
+        "queue_js": json.dumps(_AUDIO_QUEUE_JS), "stream": json.dumps(stream_id),
+        "index": index, "src": json.dumps(src),
+    }
+    with timed("audio_render"):
+        if hasattr(st, "iframe"):
+            st.iframe(html, height="content")  # the script renders nothing
+        else:
+            # Streamlit before st.iframe; imported on first use so that app
+            # start-up does not pay for it
+            import streamlit.components.v1 as components
+            components.html(html, height=0)
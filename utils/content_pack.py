@@ -0,0 +1,157 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from utils.explanation_cache import normalize_topic
+from utils.metrics import get_logger, increment
+
+logger = get_logger("content_pack")
+
+# Offline content pack file layout:
+#
+#   MAGIC | record | record | ... | index | footer
+#
+# Each record is stored zlib-compressed (explanations) or raw (audio, which is
+# already compressed). The index is zlib-compressed JSON mapping a record key
+# to [offset, length, codec]. The footer holds the index offset and length so
+# readers can memory-map the file and decode only the records they need.
+PACK_MAGIC = b"LLPACK1\n"
+FOOTER_FORMAT = "<QQ8s"
+FOOTER_SIZE = struct.calcsize(FOOTER_FORMAT)
+
+CODEC_RAW = "raw"
+CODEC_ZLIB = "zlib"
+
+
+def explanation_key(topic, language, simplify):
+    """Pack key for an explanation of topic in language."""
+    mode = "simple" if simplify else "detailed"
+    return f"exp\x1f{normalize_topic(topic)}\x1f{language}\x1f{mode}"
+
+
+def audio_key(text, language):
+    """Pack key for the audio of text spoken in language."""
+    digest = hashlib.sha256(f"{language}\x1f{text}".encode("utf-8")).hexdigest()
+    return f"audio\x1f{digest}"
+
+
+class PackWriter:
+    """Write a content pack incrementally. Use as a context manager or call close()."""
+
+    def __init__(self, path):
+        self.path = path
+        self._tmp_path = f"{path}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(PACK_MAGIC)
+        self._index = {}
+        self._lock = threading.Lock()
+
+    def _add(self, key, data, codec):
+        payload = zlib.compress(data, 9) if codec == CODEC_ZLIB else data
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(payload)
+            self._index[key] = [offset, len(payload), codec]
+
+    def add_explanation(self, topic, language, simplify, text):
+        self._add(explanation_key(topic, language, simplify), text.encode("utf-8"), CODEC_ZLIB)
+
+    def add_audio(self, text, language, audio_bytes):
+        self._add(audio_key(text, language), audio_bytes, CODEC_RAW)
+
+    def __len__(self):
+        return len(self._index)
+
+    def close(self):
+        """Write the index and footer, then atomically move the pack into place."""
+        with self._lock:
+            if self._file is None:
+                return
+            index = zlib.compress(json.dumps(self._index, ensure_ascii=False).encode("utf-8"), 9)
+            index_offset = self._file.tell()
+            self._file.write(index)
+            self._file.write(struct.pack(FOOTER_FORMAT, index_offset, len(index), PACK_MAGIC))
+            self._file.close()
+            self._file = None
+            os.replace(self._tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            self._file = None
+            os.remove(self._tmp_path)
+
+
+class ContentPack:
+    """Read-only, memory-mapped view of a content pack."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap.size() < len(PACK_MAGIC) + FOOTER_SIZE or self._mmap[:len(PACK_MAGIC)] != PACK_MAGIC:
+            raise Exception(f"Not a LocalLearn content pack: {path}")
+
+        index_offset, index_length, magic = struct.unpack(
+            FOOTER_FORMAT, self._mmap[-FOOTER_SIZE:]
+        )
+        if magic != PACK_MAGIC:
+            raise Exception(f"Content pack is truncated or corrupt: {path}")
+        raw_index = self._mmap[index_offset:index_offset + index_length]
+        self._index = json.loads(zlib.decompress(raw_index).decode("utf-8"))
+
+    def __len__(self):
+        return len(self._index)
+
+    def _get(self, key):
+        entry = self._index.get(key)
+        increment("cache_requests_total", cache="content_pack",
+                  result="hit" if entry is not None else "miss")
+        if entry is None:
+            return None
+        offset, length, codec = entry
+        data = self._mmap[offset:offset + length]
+        return zlib.decompress(data) if codec == CODEC_ZLIB else data
+
+    def get_explanation(self, topic, language, simplify=False):
+        """Return the packed explanation, or None if the pack does not have it."""
+        data = self._get(explanation_key(topic, language, simplify))
+        return data.decode("utf-8") if data is not None else None
+
+    def get_audio(self, text, language):
+        """Return packed audio bytes for text, or None if the pack does not have it."""
+        return self._get(audio_key(text, language))
+
+    def close(self):
+        self._mmap.close()
+
+
+_packs = {}
+_packs_lock = threading.Lock()
+
+
+def open_pack(path):
+    """
+    Open a content pack once per process and share it between sessions.
+
+    Returns None if path is empty or the pack cannot be opened.
+    """
+    if not path:
+        return None
+    with _packs_lock:
+        if path not in _packs:
+            try:
+                _packs[path] = ContentPack(path)
+            except Exception as e:
+                logger.warning("content_pack_open_failed", path=path, error=str(e))
+                _packs[path] = None
+        return _packs[path]
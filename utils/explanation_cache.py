@@ -0,0 +1,208 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from utils.metrics import get_logger, increment
+from utils.popularity import cache_policy
+
+logger = get_logger("explanation_cache")
+
+# Two-tier cache for generated explanations:
+#   1. In-process LRU (fast, per Streamlit server process)
+#   2. On-disk SQLite (shared across processes and restarts)
+# With a popularity policy (utils/popularity.py) the memory tier evicts and
+# admits by request frequency instead of pure recency.
+CACHE_DB_PATH = os.getenv(
+    "LOCALLEARN_CACHE_DB",
+    os.path.join(os.path.expanduser("~"), ".cache", "locallearn", "explanations.sqlite3"),
+)
+CACHE_TTL_SECONDS = int(os.getenv("LOCALLEARN_CACHE_TTL", str(7 * 24 * 3600)))
+MEMORY_CACHE_SIZE = int(os.getenv("LOCALLEARN_CACHE_MEMORY_ENTRIES", "512"))
+DISK_CACHE_SIZE = int(os.getenv("LOCALLEARN_CACHE_DISK_ENTRIES", "20000"))
+
+
+def normalize_topic(topic):
+    """Normalize a topic for cache lookups (case, whitespace, trailing punctuation)."""
+    topic = " ".join((topic or "").split()).casefold()
+    return re.sub(r"[\s.?!।]+$", "", topic)
+
+
+def make_cache_key(topic, language, simplify, model_name, system_prompt):
+    """
+    Build the cache key for an explanation request.
+
+    The system prompt is hashed into the key so that editing a prompt
+    template never serves answers generated from the old one.
+    """
+    prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+    raw = "\x1f".join([
+        normalize_topic(topic),
+        language,
+        "simple" if simplify else "detailed",
+        model_name,
+        prompt_hash,
+    ])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def make_follow_up_key(conversation, kind, language, model_name, system_prompt):
+    """
+    Build the cache key for a follow-up turn.
+
+    The whole conversation so far is part of the key: the same follow-up on
+    the same explanation is shared, and repeated follow-ups differ.
+    """
+    prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+    raw = "\x1f".join(
+        [language, "follow_up", kind, model_name, prompt_hash]
+        + [f"{turn['role']}:{turn['text']}" for turn in conversation]
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ExplanationCache:
+    """In-memory LRU (or LFU-ish with a policy) in front of a SQLite table, both with TTL expiry."""
+
+    def __init__(self, db_path=CACHE_DB_PATH, ttl=CACHE_TTL_SECONDS,
+                 memory_size=MEMORY_CACHE_SIZE, disk_size=DISK_CACHE_SIZE, policy=None):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.policy = policy
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes_since_prune = 0
+
+    def _db(self):
+        """Open the SQLite connection on first use. Returns None if disk tier is unavailable."""
+        if self._conn is None and self.db_path:
+            try:
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+                conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS explanations ("
+                    " key TEXT PRIMARY KEY,"
+                    " value TEXT NOT NULL,"
+                    " created_at REAL NOT NULL,"
+                    " accessed_at REAL NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_explanations_accessed"
+                    " ON explanations (accessed_at)"
+                )
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error as e:
+                logger.warning("explanation_disk_cache_disabled", error=str(e))
+                self.db_path = None
+        return self._conn
+
+    def get(self, key):
+        """Return the cached explanation for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            if self.policy:
+                self.policy.record(key)
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if now - created_at < self.ttl:
+                    self._memory.move_to_end(key)
+                    increment("cache_requests_total", cache="explanation", result="memory_hit")
+                    return value
+                del self._memory[key]
+
+            conn = self._db()
+            if conn is None:
+                increment("cache_requests_total", cache="explanation", result="miss")
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT value, created_at FROM explanations WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    increment("cache_requests_total", cache="explanation", result="miss")
+                    return None
+                value, created_at = row
+                if now - created_at >= self.ttl:
+                    conn.execute("DELETE FROM explanations WHERE key = ?", (key,))
+                    conn.commit()
+                    increment("cache_requests_total", cache="explanation", result="miss")
+                    return None
+                conn.execute(
+                    "UPDATE explanations SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("explanation_disk_cache_read_failed", error=str(e))
+                return None
+
+            self._remember(key, value, created_at)
+            increment("cache_requests_total", cache="explanation", result="disk_hit")
+            return value
+
+    def put(self, key, value):
+        """Store an explanation in both tiers."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+
+            conn = self._db()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO explanations (key, value, created_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= 100:
+                    self._prune(conn, now)
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("explanation_disk_cache_write_failed", error=str(e))
+
+    def clear(self):
+        """Drop every cached explanation from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            conn = self._db()
+            if conn is not None:
+                conn.execute("DELETE FROM explanations")
+                conn.commit()
+
+    def _remember(self, key, value, created_at):
+        if key not in self._memory and self.policy and len(self._memory) >= self.memory_size:
+            # Full: replace the least popular of the oldest entries, unless
+            # the new entry is even less popular (it is still on disk)
+            victim = self.policy.victim(self._memory)
+            if not self.policy.admit(key, victim):
+                increment("cache_admissions_rejected_total", cache="explanation")
+                return
+            if victim is not None:
+                del self._memory[victim]
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _prune(self, conn, now):
+        """Remove expired rows, then the least recently used rows above the size limit."""
+        self._writes_since_prune = 0
+        conn.execute("DELETE FROM explanations WHERE created_at < ?", (now - self.ttl,))
+        conn.execute(
+            "DELETE FROM explanations WHERE key IN ("
+            " SELECT key FROM explanations ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.disk_size,),
+        )
+
+
+# Shared cache instance used by agents/tutor_agent.py
+explanation_cache = ExplanationCache(policy=cache_policy(MEMORY_CACHE_SIZE))
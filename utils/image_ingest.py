@@ -0,0 +1,177 @@
+import hashlib
+import io
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from utils.metrics import get_logger, increment, timed
+from utils.single_flight import SingleFlight
+
+logger = get_logger("image_ingest")
+
+# Ingestion for uploaded textbook photos. Phone photos are 12 MP and up, so an
+# upload is decoded once at reduced size (JPEG draft mode), turned upright
+# from its EXIF orientation and capped in pixel count. The small JPEG that
+# results is what the page displays and what topic extraction sees. Both the
+# image and the extracted topic are cached by the upload's content hash, so
+# Streamlit reruns with the same upload cost one hash and a dict lookup.
+# A failed extraction (e.g. a 429 from Gemini) keeps the downscaled image but
+# is retried once EXTRACT_RETRY_SECONDS have passed, so re-uploading the photo
+# works after a transient error without every rerun calling the extractor.
+IMAGE_MAX_PIXELS = int(os.getenv("LOCALLEARN_IMAGE_MAX_PIXELS", str(1600 * 1200)))
+IMAGE_CACHE_ENTRIES = int(os.getenv("LOCALLEARN_IMAGE_CACHE_ENTRIES", "64"))
+IMAGE_EXTRACTOR = os.getenv("LOCALLEARN_IMAGE_EXTRACTOR", "gemini").lower()
+JPEG_QUALITY = 85
+EXTRACT_RETRY_SECONDS = 30
+
+
+def image_hash(data):
+    """Content hash of uploaded image bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def downscale_image(data, max_pixels=IMAGE_MAX_PIXELS):
+    """
+    Decode an image upright and at most max_pixels in size.
+
+    Returns:
+        JPEG bytes of the downscaled image
+    """
+    from PIL import Image, ImageOps
+
+    image = Image.open(io.BytesIO(data))
+    width, height = image.size
+    if width * height > max_pixels:
+        # JPEG only: let the decoder skip detail (1/2, 1/4 or 1/8 scale)
+        # instead of decoding every pixel of the full-size photo
+        scale = math.sqrt(max_pixels / (width * height))
+        image.draft("RGB", (max(1, int(width * scale)), max(1, int(height * scale))))
+
+    image = ImageOps.exif_transpose(image)
+    width, height = image.size
+    if width * height > max_pixels:
+        scale = math.sqrt(max_pixels / (width * height))
+        image = image.resize((max(1, int(width * scale)), max(1, int(height * scale))),
+                             Image.LANCZOS)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def topic_from_text(text):
+    """Pick the most heading-like line of OCR text as the topic, or None."""
+    for line in (text or "").splitlines():
+        # Drop section numbering such as "3.2" or "Chapter 4:"
+        line = re.sub(r"^\s*(chapter|lesson|unit)?\s*[\d.]+\s*[:.)-]?\s*", "", line, flags=re.I)
+        line = " ".join(line.split())
+        letters = sum(ch.isalpha() for ch in line)
+        if letters >= 3 and letters >= len(line) / 2 and len(line.split()) <= 8:
+            return line
+    return None
+
+
+class GeminiTopicExtractor:
+    """Ask multimodal Gemini for the main topic on the page."""
+
+    name = "gemini"
+
+    def extract(self, image_bytes):
+        from agents.tutor_agent import extract_topic_from_image
+        return extract_topic_from_image(image_bytes, "image/jpeg")
+
+
+class OCRTopicExtractor:
+    """Read the page locally with Tesseract (pytesseract) and take its first heading."""
+
+    name = "ocr"
+
+    def extract(self, image_bytes):
+        try:
+            import pytesseract
+        except ImportError:
+            raise Exception("Local OCR needs the pytesseract package and the tesseract binary")
+        from PIL import Image
+
+        text = pytesseract.image_to_string(Image.open(io.BytesIO(image_bytes)))
+        return topic_from_text(text)
+
+
+EXTRACTORS = {
+    "gemini": GeminiTopicExtractor,
+    "ocr": OCRTopicExtractor,
+}
+
+
+def get_extractor(name=IMAGE_EXTRACTOR):
+    """Return the extractor registered under name, or None for "none" or an unknown name."""
+    if name in ("", "none"):
+        return None
+    if name not in EXTRACTORS:
+        logger.warning("unknown_image_extractor", name=name, choices=", ".join(EXTRACTORS))
+        return None
+    return EXTRACTORS[name]()
+
+
+class ImageIngestor:
+    """Downscale uploads and extract their topic, cached by content hash."""
+
+    def __init__(self, extractor=None, max_pixels=IMAGE_MAX_PIXELS, cache_size=IMAGE_CACHE_ENTRIES):
+        self.extractor = extractor
+        self.max_pixels = max_pixels
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # hash -> (image_bytes, topic, retry_at or None)
+        self._lock = threading.Lock()
+        self._flight = SingleFlight("image")
+
+    def ingest(self, data):
+        """
+        Prepare uploaded image bytes.
+
+        Returns:
+            (image_bytes, topic): downscaled JPEG for display, and the topic
+            found on the page or None if there was none or extraction failed
+        """
+        key = image_hash(data)
+        image_bytes = None
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                image_bytes, topic, retry_at = entry
+                if retry_at is None or time.monotonic() < retry_at:
+                    increment("cache_requests_total", cache="image", result="memory_hit")
+                    return image_bytes, topic
+        increment("cache_requests_total", cache="image", result="miss")
+        return self._flight.do(key, lambda: self._ingest(key, data, image_bytes))
+
+    def _ingest(self, key, data, image_bytes=None):
+        if image_bytes is None:
+            with timed("image_decode"):
+                image_bytes = downscale_image(data, self.max_pixels)
+
+        topic = None
+        retry_at = None
+        if self.extractor is not None:
+            try:
+                with timed("image_extract", extractor=self.extractor.name):
+                    topic = self.extractor.extract(image_bytes)
+            except Exception as e:
+                # The user can still type the topic; extraction is retried later
+                logger.warning("image_topic_extraction_failed", extractor=self.extractor.name, error=str(e))
+                increment("errors_total", component="image_extract", kind=self.extractor.name)
+                retry_at = time.monotonic() + EXTRACT_RETRY_SECONDS
+
+        with self._lock:
+            self._cache[key] = (image_bytes, topic, retry_at)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return image_bytes, topic
+
+
+# Shared ingestor used by main.py
+image_ingestor = ImageIngestor(get_extractor())
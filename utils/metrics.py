@@ -0,0 +1,251 @@
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Lightweight in-process observability:
+#   - structured, leveled logs (key=value text or JSON lines)
+#   - latency histograms per stage (prompt build, Gemini, time to first token,
+#     TTS synthesis, audio render, explanation render)
+#   - counters for cache hits/misses, fallbacks and errors
+# Metrics can be exported in Prometheus text format or as JSON, and optionally
+# served over HTTP on LOCALLEARN_METRICS_PORT.
+LOG_LEVEL = os.getenv("LOCALLEARN_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOCALLEARN_LOG_FORMAT", "text").lower()
+METRICS_PORT = int(os.getenv("LOCALLEARN_METRICS_PORT", "0"))
+
+# Latency buckets in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _StructuredFormatter(logging.Formatter):
+    def format(self, record):
+        fields = getattr(record, "fields", {})
+        if LOG_FORMAT == "json":
+            entry = {
+                "ts": round(record.created, 3),
+                "level": record.levelname.lower(),
+                "logger": record.name,
+                "event": record.getMessage(),
+            }
+            entry.update(fields)
+            return json.dumps(entry, ensure_ascii=False, default=str)
+        pairs = " ".join(f"{key}={value}" for key, value in fields.items())
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.created))
+        return f"{timestamp} {record.levelname:<7} {record.name} {record.getMessage()} {pairs}".rstrip()
+
+
+_root_logger = logging.getLogger("locallearn")
+if not _root_logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(_StructuredFormatter())
+    _root_logger.addHandler(_handler)
+    _root_logger.setLevel(LOG_LEVEL)
+    _root_logger.propagate = False
+
+
+class StructuredLogger:
+    """Log an event name plus key=value fields: logger.info("tts_done", bytes=1024)."""
+
+    def __init__(self, name):
+        self._logger = logging.getLogger(f"locallearn.{name}")
+
+    def _log(self, level, event, fields):
+        if self._logger.isEnabledFor(level):
+            self._logger.log(level, event, extra={"fields": fields})
+
+    def debug(self, event, **fields):
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event, **fields):
+        self._log(logging.INFO, event, fields)
+
+    def warning(self, event, **fields):
+        self._log(logging.WARNING, event, fields)
+
+    def error(self, event, **fields):
+        self._log(logging.ERROR, event, fields)
+
+
+def get_logger(name):
+    return StructuredLogger(name)
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+
+
+_lock = threading.Lock()
+_histograms = {}  # (name, labels) -> _Histogram
+_counters = {}  # (name, labels) -> value
+
+
+def _labels_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def observe(name, seconds, **labels):
+    """Record a latency observation in seconds."""
+    key = (name, _labels_key(labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = _Histogram()
+        histogram.observe(seconds)
+
+
+def increment(name, amount=1, **labels):
+    """Increase a counter."""
+    key = (name, _labels_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+@contextmanager
+def timed(stage, **labels):
+    """Time a block as one observation of locallearn_stage_seconds{stage=...}."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe("stage_seconds", time.perf_counter() - start, stage=stage, **labels)
+
+
+def reset():
+    """Clear all metrics (used by benchmarks between runs)."""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+
+def export_prometheus():
+    """Render all metrics in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        histograms = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+
+    seen = set()
+    for (name, labels), histogram in histograms:
+        metric = f"locallearn_{name}"
+        if metric not in seen:
+            lines.append(f"# TYPE {metric} histogram")
+            seen.add(metric)
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ("+Inf",), histogram.counts):
+            cumulative += count
+            lines.append(f"{metric}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.total:.6f}")
+        lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+
+    for (name, labels), value in counters:
+        metric = f"locallearn_{name}"
+        if metric not in seen:
+            lines.append(f"# TYPE {metric} counter")
+            seen.add(metric)
+        lines.append(f"{metric}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def _quantile(histogram, q):
+    """Estimate a quantile from bucket counts (upper bound of the bucket it falls in)."""
+    if histogram.count == 0:
+        return None
+    rank = q * histogram.count
+    cumulative = 0
+    for bound, count in zip(BUCKETS + (float("inf"),), histogram.counts):
+        cumulative += count
+        if cumulative >= rank:
+            return bound
+    return float("inf")
+
+
+def export_json():
+    """Return all metrics as a JSON-serializable dict."""
+    with _lock:
+        histograms = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+    return {
+        "histograms": [
+            {
+                "name": name,
+                "labels": dict(labels),
+                "count": histogram.count,
+                "sum": round(histogram.total, 6),
+                "mean": round(histogram.total / histogram.count, 6) if histogram.count else None,
+                "p50": _quantile(histogram, 0.5),
+                "p95": _quantile(histogram, 0.95),
+                "p99": _quantile(histogram, 0.99),
+            }
+            for (name, labels), histogram in histograms
+        ],
+        "counters": [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in counters
+        ],
+    }
+
+
+def _serve(port):
+    # http.server pulls in email/http.client/ssl; import it only when serving
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = export_prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(export_json()), "application/json"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=METRICS_PORT):
+    """Serve /metrics and /metrics.json on port in a background thread (once per process)."""
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = _serve(port)
+            except OSError as e:
+                get_logger("metrics").warning("metrics_server_failed", port=port, error=str(e))
+                return None
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+            get_logger("metrics").info("metrics_server_started", port=port)
+    return _server
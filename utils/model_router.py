@@ -0,0 +1,156 @@
+import os
+import random
+import threading
+import time
+from utils.metrics import get_logger, increment
+from utils.rate_limit import UpstreamUnavailable, gemini_key_upstream, is_rate_limit_error, is_retryable_error
+
+logger = get_logger("router")
+
+# Latency-aware routing of Gemini calls over a pool of API keys and models.
+# Every (key, model) pair is a route with its own health: an exponentially
+# weighted moving average (EWMA) of latency and of its error rate, and the
+# number of calls in flight. Each call goes to the route with the lowest
+# expected latency; a route whose key hit its quota is cooled down and the
+# call fails over to the next one. Each key has its own token bucket and
+# circuit breaker, since each key has its own quota.
+#
+# Models are listed per mode, e.g. a lighter model for "Make Even Simpler".
+# The models of a mode are treated as interchangeable and the fastest
+# healthy one wins; list only models whose answers you are happy to serve.
+GEMINI_MODELS = os.getenv("LOCALLEARN_GEMINI_MODELS", "gemini-2.5-flash")
+GEMINI_SIMPLIFY_MODELS = os.getenv("LOCALLEARN_GEMINI_SIMPLIFY_MODELS", "gemini-2.5-flash-lite,gemini-2.5-flash")
+KEY_COOLDOWN = float(os.getenv("LOCALLEARN_KEY_COOLDOWN", "60"))
+EWMA_ALPHA = 0.2
+EXPLORE_PROBABILITY = 0.05  # occasionally re-measure routes that are not the fastest
+
+
+def _split(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def gemini_api_keys():
+    """API keys from GOOGLE_API_KEYS (comma-separated), or the single GOOGLE_API_KEY."""
+    return _split(os.getenv("GOOGLE_API_KEYS", "")) or _split(os.getenv("GOOGLE_API_KEY", ""))
+
+
+# Models per mode; "image" reads topics off textbook photos
+MODE_MODELS = {
+    "detailed": _split(GEMINI_MODELS),
+    "simplify": _split(GEMINI_SIMPLIFY_MODELS) or _split(GEMINI_MODELS),
+    "image": _split(GEMINI_MODELS),
+}
+
+
+def model_spec(mode, mode_models=MODE_MODELS):
+    """The mode's model list as a string; part of explanation cache keys."""
+    return ",".join(mode_models[mode])
+
+
+class Route:
+    """One (API key, model) pair and its recent health."""
+
+    def __init__(self, key_index, model):
+        self.key_index = key_index
+        self.model = model
+        self.latency = {}  # (mode, call kind) -> EWMA seconds; kinds are "blocking" and "stream"
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+
+    def score(self, kind):
+        """Expected latency of one more call; unmeasured routes score 0 so they get tried."""
+        latency = self.latency.get(kind)
+        if latency is None:
+            return 0.0
+        return latency * (1 + self.in_flight) / max(0.05, 1.0 - self.error_rate)
+
+    def labels(self):
+        return {"model": self.model, "key": str(self.key_index + 1)}
+
+
+class ModelRouter:
+    """Pick the fastest healthy (key, model) route per mode and fail over on quota errors."""
+
+    def __init__(self, key_count, mode_models=MODE_MODELS, cooldown=KEY_COOLDOWN, alpha=EWMA_ALPHA):
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self.upstreams = [gemini_key_upstream(index) for index in range(key_count)]
+        # Quotas are per key and model, so modes sharing a model share its routes
+        pairs = {}
+        self.routes = {
+            mode: [pairs.setdefault((index, model), Route(index, model))
+                   for model in models for index in range(key_count)]
+            for mode, models in mode_models.items()
+        }
+        self._lock = threading.Lock()
+
+    def _choose(self, mode, kind, exclude):
+        now = time.monotonic()
+        with self._lock:
+            available = [route for route in self.routes[mode]
+                         if route not in exclude and route.cooldown_until <= now]
+            if not available:
+                return None, False
+            if len(available) > 1 and random.random() < EXPLORE_PROBABILITY:
+                route = random.choice(available)
+            else:
+                route = min(available, key=lambda r: r.score((mode, kind)))
+            route.in_flight += 1
+            return route, len(available) > 1
+
+    def call(self, mode, fn, kind="blocking"):
+        """
+        Call fn(route) on the best route for mode, failing over to other routes.
+
+        Returns:
+            (result, route)
+
+        Raises:
+            The last error once every route failed or is cooling down, or at
+            once for errors that are about the request rather than the route
+        """
+        tried = set()
+        last_error = None
+        while True:
+            route, has_alternative = self._choose(mode, kind, tried)
+            if route is None:
+                raise last_error or UpstreamUnavailable("Every Gemini key is over its quota; try again shortly")
+            tried.add(route)
+            increment("router_requests_total", mode=mode, **route.labels())
+
+            started = time.monotonic()
+            try:
+                # Back off on throttling only when there is nowhere else to go
+                result = self.upstreams[route.key_index].call(
+                    lambda: fn(route), retry_rate_limits=not has_alternative)
+            except Exception as e:
+                self._finish(route, (mode, kind), None)
+                if not is_retryable_error(e) and not isinstance(e, UpstreamUnavailable):
+                    raise
+                self.record_failure(route, e)
+                logger.info("route_failover", mode=mode, error=str(e)[:80], **route.labels())
+                increment("router_failovers_total", mode=mode, **route.labels())
+                last_error = e
+                continue
+            self._finish(route, (mode, kind), time.monotonic() - started)
+            return result, route
+
+    def _finish(self, route, kind, seconds):
+        with self._lock:
+            route.in_flight -= 1
+            if seconds is None:
+                return
+            previous = route.latency.get(kind)
+            route.latency[kind] = seconds if previous is None else (
+                self.alpha * seconds + (1 - self.alpha) * previous)
+            route.error_rate *= 1 - self.alpha
+
+    def record_failure(self, route, error):
+        """Count a failed call against route (also for failures after a stream started)."""
+        with self._lock:
+            route.error_rate = self.alpha + (1 - self.alpha) * route.error_rate
+            # Over quota: stop sending this route traffic for a while
+            if is_rate_limit_error(error) and not isinstance(error, UpstreamUnavailable):
+                route.cooldown_until = time.monotonic() + self.cooldown
+                logger.warning("route_cooldown", seconds=self.cooldown, **route.labels())
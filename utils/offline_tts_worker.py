@@ -0,0 +1,231 @@
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from utils.metrics import get_logger, increment
+
+logger = get_logger("offline_tts")
+
+# Long-lived offline TTS worker.
+# pyttsx3 is slow to initialise and not safe to drive from several Streamlit
+# session threads at once, so one child process owns a warm engine and a
+# pre-resolved voice per language. Sessions send jobs over a queue and wait
+# for the audio bytes. The worker reports when it starts each job, and only
+# a job that runs longer than OFFLINE_TTS_TIMEOUT restarts the worker. A job
+# still queued after OFFLINE_TTS_QUEUE_TIMEOUT is rejected (the worker skips
+# it when it gets there) without touching the worker or the jobs ahead of it.
+OFFLINE_TTS_TIMEOUT = float(os.getenv("LOCALLEARN_OFFLINE_TTS_TIMEOUT", "60"))
+OFFLINE_TTS_QUEUE_TIMEOUT = float(os.getenv("LOCALLEARN_OFFLINE_TTS_QUEUE_TIMEOUT", "30"))
+
+
+def _resolve_voices(engine, lang_codes):
+    """Pick an installed voice for every language, matching language codes then names."""
+    voices = engine.getProperty('voices') or []
+    voice_map = {}
+    for language, code in lang_codes.items():
+        for voice in voices:
+            voice_langs = []
+            for lang in getattr(voice, 'languages', None) or []:
+                if isinstance(lang, bytes):
+                    lang = lang.decode('utf-8', errors='ignore')
+                voice_langs.append(str(lang).lstrip('\x05').lower())
+            name = (voice.name or "").lower()
+            if any(lang.startswith(code) for lang in voice_langs) or language.lower() in name:
+                voice_map[language] = voice.id
+                break
+    return voice_map
+
+
+def _worker_main(jobs, results, lang_codes):
+    """Child process: initialise pyttsx3 once, then serve jobs until told to stop."""
+    import pyttsx3
+
+    engine = pyttsx3.init()
+    default_voice = engine.getProperty('voice')
+    voice_map = _resolve_voices(engine, lang_codes)
+    temp_dir = tempfile.gettempdir()
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        job_id, text, language, deadline = job
+        if time.time() > deadline:
+            continue  # the caller stopped waiting while the job was queued
+        results.put(("started", job_id, None, None))
+        audio_file = os.path.join(temp_dir, f"tts_offline_{uuid.uuid4().hex}.wav")
+        try:
+            engine.setProperty('voice', voice_map.get(language, default_voice))
+            engine.save_to_file(text, audio_file)
+            engine.runAndWait()
+            with open(audio_file, "rb") as f:
+                results.put(("done", job_id, f.read(), None))
+        except Exception as e:
+            results.put(("done", job_id, None, str(e)))
+        finally:
+            if os.path.exists(audio_file):
+                os.remove(audio_file)
+
+
+class _Job:
+    def __init__(self, text, language, deadline):
+        self.text = text
+        self.language = language
+        self.deadline = deadline  # wall-clock time after which the worker skips the job
+        self.future = Future()
+        self.started = threading.Event()  # also set when the job fails before starting
+        self.started_at = None
+
+
+class OfflineTTSWorker:
+    """Parent-side handle that starts, feeds and restarts the worker process."""
+
+    def __init__(self, lang_codes, timeout=OFFLINE_TTS_TIMEOUT, queue_timeout=OFFLINE_TTS_QUEUE_TIMEOUT):
+        self.lang_codes = dict(lang_codes)
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._process = None
+        self._jobs = None
+        self._pending = {}
+        self._next_id = 0
+
+    def _start(self):
+        # spawn, not fork: the Streamlit server process is multi-threaded
+        ctx = multiprocessing.get_context("spawn")
+        self._jobs = ctx.Queue()
+        results = ctx.Queue()
+        self._process = ctx.Process(
+            target=_worker_main,
+            args=(self._jobs, results, self.lang_codes),
+            name="offline-tts",
+            daemon=True,
+        )
+        self._process.start()
+        threading.Thread(
+            target=self._read_results, args=(self._process, results),
+            name="offline-tts-results", daemon=True,
+        ).start()
+
+    def _read_results(self, process, results):
+        """Resolve futures as results arrive; notice if the worker process dies."""
+        while True:
+            try:
+                kind, job_id, audio_bytes, error = results.get(timeout=1)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                self._fail_pending(process, "Offline TTS worker exited")
+                return
+            except (EOFError, OSError):
+                self._fail_pending(process, "Offline TTS worker exited")
+                return
+
+            with self._lock:
+                if kind == "started":
+                    job = self._pending.get(job_id)
+                    if job is not None:
+                        job.started_at = time.monotonic()
+                        job.started.set()
+                    continue
+                job = self._pending.pop(job_id, None)
+            if job is None:
+                continue
+            if error:
+                job.future.set_exception(Exception(error))
+            else:
+                job.future.set_result(audio_bytes)
+            job.started.set()
+
+    def _fail_pending(self, process, reason):
+        with self._lock:
+            if self._process is not process:
+                return
+            pending, self._pending = self._pending, {}
+            self._process = None
+        for job in pending.values():
+            job.future.set_exception(Exception(reason))
+            job.started.set()
+
+    def synthesize(self, text, language, timeout=None):
+        """
+        Synthesize text in the worker process.
+
+        Returns:
+            WAV audio bytes
+
+        Raises:
+            Exception if synthesis fails, waits in the queue longer than
+            queue_timeout, or runs longer than timeout (the worker is restarted)
+        """
+        timeout = timeout or self.timeout
+        job = _Job(text, language, time.time() + self.queue_timeout)
+        with self._lock:
+            if self._process is None or not self._process.is_alive():
+                self._start()
+            self._next_id += 1
+            job_id = self._next_id
+            self._submit(job_id, job)
+
+        # Time in the queue behind other jobs is not the worker's fault
+        if not job.started.wait(self.queue_timeout):
+            with self._lock:
+                rejected = not job.started.is_set() and self._pending.pop(job_id, None) is not None
+            if rejected:
+                logger.warning("offline_tts_queue_timeout", timeout=self.queue_timeout)
+                increment("errors_total", component="offline_tts", kind="queue_timeout")
+                raise Exception("Offline TTS is busy; try again shortly")
+
+        # Time only the job itself; restart the worker if it is stuck on it
+        remaining = timeout
+        if job.started_at is not None:
+            remaining = max(0.0, timeout - (time.monotonic() - job.started_at))
+        try:
+            return job.future.result(timeout=remaining)
+        except FutureTimeoutError:
+            logger.warning("offline_tts_worker_timeout", timeout=timeout)
+            increment("errors_total", component="offline_tts", kind="timeout")
+            self._restart(job_id)
+            raise Exception("Offline TTS timed out")
+
+    def _submit(self, job_id, job):
+        """Queue a job for the current worker (call with the lock held)."""
+        self._pending[job_id] = job
+        self._jobs.put((job_id, job.text, job.language, job.deadline))
+
+    def _restart(self, stuck_id):
+        """
+        Kill the worker stuck on job stuck_id. Jobs that had not started move
+        to a fresh worker; only jobs it was running fail.
+        """
+        with self._lock:
+            job = self._pending.get(stuck_id)
+            process = self._process
+            if job is None or process is None:
+                return  # finished meanwhile, or the worker was already replaced
+            pending, self._pending = self._pending, {}
+            self._process = None
+            failed = [job for job in pending.values() if job.started_at is not None]
+            queued = [(job_id, job) for job_id, job in sorted(pending.items()) if job.started_at is None]
+            if queued:
+                self._start()
+                for job_id, job in queued:
+                    self._submit(job_id, job)
+        process.terminate()
+        process.join(timeout=5)
+        for job in failed:
+            job.future.set_exception(Exception("Offline TTS worker restarted"))
+
+    def shutdown(self):
+        with self._lock:
+            process, jobs = self._process, self._jobs
+        if process is not None and process.is_alive():
+            jobs.put(None)
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,160 @@
+import heapq
+import os
+
+# Popularity tracking in bounded memory:
+#   - CountMinSketch estimates how often a key was seen with a fixed table of
+#     counters (never under-counts; over-counts only on hash collisions).
+#     Counters are halved every `window` additions so old popularity fades.
+#   - HeavyHitters keeps the top K keys of a stream on top of a sketch.
+#   - PopularityPolicy gives a cache LFU-ish eviction and admission (in the
+#     spirit of TinyLFU): the victim is the least popular of the few least
+#     recently used entries, and a new entry that is less popular than the
+#     victim is not admitted at all, so one-off requests cannot flush the
+#     entries everyone keeps asking for.
+CACHE_POLICY = os.getenv("LOCALLEARN_CACHE_POLICY", "lfu").lower()  # lfu or lru
+EVICTION_SAMPLE = 8
+
+
+def _pow2(n):
+    return 1 << max(0, int(n) - 1).bit_length()
+
+
+class CountMinSketch:
+    """Approximate counts of keys in width × depth counters."""
+
+    def __init__(self, width=2048, depth=4, window=None):
+        self.width = _pow2(width)
+        self.depth = depth
+        self.window = window or 10 * self.width
+        self.resets = 0
+        self._rows = [[0] * self.width for _ in range(depth)]
+        self._additions = 0
+
+    def _indexes(self, key):
+        # Double hashing on the built-in hash: counts live only in this
+        # process, so per-process hash randomization does not matter
+        h = (hash(key) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF  # spread small ints
+        step = (h >> 32) | 1
+        mask = self.width - 1
+        return [(h + i * step) & mask for i in range(self.depth)]
+
+    def add(self, key):
+        """Count one occurrence of key. Returns its new estimate."""
+        estimate = None
+        for row, index in zip(self._rows, self._indexes(key)):
+            row[index] += 1
+            estimate = row[index] if estimate is None else min(estimate, row[index])
+        self._additions += 1
+        if self._additions >= self.window:
+            self._halve()
+            estimate //= 2
+        return estimate
+
+    def estimate(self, key):
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+    def _halve(self):
+        for row in self._rows:
+            for i, count in enumerate(row):
+                row[i] = count >> 1
+        self._additions //= 2
+        self.resets += 1
+
+
+class HeavyHitters:
+    """
+    The K most frequent keys of a stream, using a count-min sketch and a min-heap.
+
+    Each tracked key can carry a payload (e.g. the topic as a student typed
+    it), which is kept while the key stays in the top K.
+    """
+
+    def __init__(self, k, sketch=None):
+        self.k = k
+        self.sketch = sketch or CountMinSketch()
+        self._counts = {}  # tracked key -> estimate
+        self._payloads = {}
+        self._heap = []  # (estimate, key); entries whose estimate changed since are stale
+        self._resets = self.sketch.resets
+
+    def add(self, key, payload=None):
+        estimate = self.sketch.add(key)
+        if self.sketch.resets != self._resets:
+            # The sketch was halved: age the tracked counts the same way
+            self._resets = self.sketch.resets
+            self._counts = {tracked: count >> 1 for tracked, count in self._counts.items()}
+            self._rebuild_heap()
+
+        if key not in self._counts and len(self._counts) >= self.k:
+            smallest, smallest_key = self._min()
+            if estimate <= smallest:
+                return
+            del self._counts[smallest_key]
+            self._payloads.pop(smallest_key, None)
+            heapq.heappop(self._heap)
+        self._counts[key] = estimate
+        if payload is not None:
+            self._payloads[key] = payload
+        heapq.heappush(self._heap, (estimate, key))
+        if len(self._heap) > 4 * self.k:
+            self._rebuild_heap()
+
+    def _min(self):
+        while self._counts.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0]
+
+    def _rebuild_heap(self):
+        self._heap = [(count, key) for key, count in self._counts.items()]
+        heapq.heapify(self._heap)
+
+    def top(self, n=None):
+        """[(key, estimated count, payload)], most frequent first."""
+        ranked = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)
+        return [(key, count, self._payloads.get(key)) for key, count in ranked[:n]]
+
+    def __len__(self):
+        return len(self._counts)
+
+
+class PopularityPolicy:
+    """
+    LFU-ish eviction and admission for an LRU-ordered cache.
+
+    Not thread-safe: the cache calls it while holding its own lock.
+    """
+
+    def __init__(self, capacity, sample=EVICTION_SAMPLE):
+        self.sketch = CountMinSketch(width=4 * max(64, capacity))
+        self.sample = sample
+
+    def record(self, key):
+        """Count a lookup of key (hit or miss)."""
+        self.sketch.add(key)
+
+    def victim(self, entries, exclude=None):
+        """The least popular of the first `sample` keys of entries (least recently used first)."""
+        best = None
+        best_count = None
+        seen = 0
+        for key in entries:
+            if key == exclude:
+                continue
+            count = self.sketch.estimate(key)
+            if best is None or count < best_count:
+                best, best_count = key, count
+            seen += 1
+            if seen >= self.sample:
+                break
+        return best
+
+    def admit(self, candidate, victim):
+        """True if candidate is at least as popular as the entry it would replace."""
+        return victim is None or self.sketch.estimate(candidate) >= self.sketch.estimate(victim)
+
+
+def cache_policy(capacity):
+    """The configured policy for a cache of about capacity entries (None means plain LRU)."""
+    if CACHE_POLICY == "lru":
+        return None
+    return PopularityPolicy(capacity)
@@ -0,0 +1,168 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from agents.tutor_agent import ask_follow_up, record_follow_up
+from utils.access_log import access_log
+from utils.audio_utils import prepare_tts_text, speak_text
+from utils.metrics import get_logger, increment
+
+logger = get_logger("prefetch")
+
+# Speculative prefetch of the simplified explanation and its audio.
+# After a detailed explanation succeeds, a background worker generates the
+# "Make Even Simpler" follow-up turn so the button can respond instantly. Each
+# session has at most one prefetch; starting a new one cancels the old one.
+# A claim never waits for a job that is still queued behind other sessions'
+# prefetches (streaming the answer is faster), and the text is handed over as
+# soon as it exists: audio that is still being synthesized is picked up by the
+# app's own speak_text call, which joins the in-flight synthesis.
+PREFETCH_WORKERS = int(os.getenv("LOCALLEARN_PREFETCH_WORKERS", "2"))
+PREFETCH_MAX_PER_HOUR = int(os.getenv("LOCALLEARN_PREFETCH_MAX_PER_HOUR", "200"))
+PREFETCH_CLAIM_TIMEOUT = float(os.getenv("LOCALLEARN_PREFETCH_CLAIM_TIMEOUT", "60"))
+PREFETCH_RESULT_TTL = 600  # unclaimed results are dropped after 10 minutes
+
+_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+_lock = threading.Lock()
+_jobs = {}  # session_id -> (key, future, cancel_event, started_at, text_ready)
+_recent_calls = deque()  # start times of speculative jobs in the last hour
+
+
+def _take_budget():
+    """Reserve one speculative job from the hourly budget. Returns False if exhausted."""
+    now = time.time()
+    while _recent_calls and now - _recent_calls[0] > 3600:
+        _recent_calls.popleft()
+    if len(_recent_calls) >= PREFETCH_MAX_PER_HOUR:
+        return False
+    _recent_calls.append(now)
+    return True
+
+
+def _conversation_key(conversation, language):
+    return tuple(turn["text"] for turn in conversation), language
+
+
+def _run_prefetch(conversation, language, cancel_event, text_ready):
+    explanation = None
+    try:
+        if not cancel_event.is_set():
+            # Speculative work, not a student request: keep it out of the access log
+            with access_log.paused():
+                explanation = ask_follow_up(conversation, language, "simpler")
+    except Exception as e:
+        text_ready.set_exception(e)
+        raise
+    text_ready.set_result(explanation)
+
+    # Skip the TTS call if the topic changed while Gemini was answering
+    if explanation is None or cancel_event.is_set():
+        return None
+    with access_log.paused():
+        audio_bytes, audio_file = speak_text(prepare_tts_text(explanation), language)
+    return explanation, audio_bytes, audio_file
+
+
+def start_prefetch(session_id, conversation, language):
+    """
+    Start generating the simpler follow-up and its audio for a conversation in the background.
+
+    Any different prefetch for the same session is cancelled. Returns False if
+    the hourly speculative budget is exhausted.
+    """
+    key = _conversation_key(conversation, language)
+    with _lock:
+        _drop_stale_jobs()
+        job = _jobs.get(session_id)
+        if job is not None:
+            if job[0] == key:
+                return True
+            _cancel_job(job)
+
+        if not _take_budget():
+            _jobs.pop(session_id, None)
+            logger.info("prefetch_budget_exhausted")
+            increment("prefetch_total", result="budget_exhausted")
+            return False
+
+        cancel_event = threading.Event()
+        text_ready = Future()
+        future = _executor.submit(_run_prefetch, conversation, language, cancel_event, text_ready)
+        increment("prefetch_total", result="started")
+        _jobs[session_id] = (key, future, cancel_event, time.time(), text_ready)
+        return True
+
+
+def claim_prefetch(session_id, conversation, language, timeout=PREFETCH_CLAIM_TIMEOUT):
+    """
+    Claim the prefetched follow-up for a conversation.
+
+    A job that has not started yet is cancelled rather than waited for; a
+    running one is waited for until its text is ready (at most timeout).
+
+    Returns:
+        (explanation, audio_bytes, audio_file), or None if there is no usable
+        prefetch (other conversation/language, not started, cancelled or
+        failed). audio_bytes and audio_file are None while the audio is
+        still being synthesized.
+    """
+    with _lock:
+        job = _jobs.pop(session_id, None)
+    if job is None:
+        return None
+
+    key, future, text_ready = job[0], job[1], job[4]
+    if key != _conversation_key(conversation, language):
+        _cancel_job(job)
+        increment("prefetch_total", result="mismatch")
+        return None
+
+    # Still queued behind other sessions' prefetches: streaming is faster
+    if future.cancel():
+        increment("prefetch_total", result="not_started")
+        return None
+
+    try:
+        explanation = text_ready.result(timeout=timeout)
+    except (CancelledError, FutureTimeoutError):
+        increment("prefetch_total", result="missed")
+        return None
+    except Exception as e:
+        logger.warning("prefetch_failed", error=str(e))
+        increment("prefetch_total", result="failed")
+        return None
+    if not explanation:
+        increment("prefetch_total", result="missed")
+        return None
+
+    audio_bytes, audio_file = None, None
+    if future.done() and not future.cancelled() and future.exception() is None and future.result():
+        _, audio_bytes, audio_file = future.result()
+    increment("prefetch_total", result="claimed")
+    # The student asked for it now
+    record_follow_up(conversation, language, "simpler")
+    return explanation, audio_bytes, audio_file
+
+
+def cancel_prefetch(session_id):
+    """Cancel the session's prefetch, if any."""
+    with _lock:
+        job = _jobs.pop(session_id, None)
+    if job is not None:
+        _cancel_job(job)
+
+
+def _cancel_job(job):
+    key, future, cancel_event, started_at, text_ready = job
+    cancel_event.set()
+    future.cancel()
+
+
+def _drop_stale_jobs():
+    """Forget finished prefetches that were never claimed (e.g. the session ended)."""
+    now = time.time()
+    for session_id, job in list(_jobs.items()):
+        if job[1].done() and now - job[3] > PREFETCH_RESULT_TTL:
+            del _jobs[session_id]
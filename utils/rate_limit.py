@@ -0,0 +1,194 @@
+import os
+import random
+import threading
+import time
+from utils.metrics import get_logger, increment
+
+logger = get_logger("rate_limit")
+
+# Process-wide protection for the external services (Gemini, gTTS):
+#   - a token bucket per upstream smooths bursts from many sessions
+#   - retryable errors (429, 5xx, network) are retried with jittered backoff
+#   - a circuit breaker fails fast while an upstream keeps failing, so callers
+#     can go straight to their offline path instead of waiting on a doomed call
+
+
+class UpstreamUnavailable(Exception):
+    """Raised without calling the upstream: circuit open or rate limit wait too long."""
+
+
+def is_rate_limit_error(error):
+    """True if the error means the upstream is throttling us."""
+    if isinstance(error, UpstreamUnavailable):
+        return True
+    message = str(error).lower()
+    return ("429" in message or "too many requests" in message
+            or "resource exhausted" in message or "quota" in message)
+
+
+def is_retryable_error(error):
+    """True for throttling, server-side and network errors worth retrying."""
+    if isinstance(error, UpstreamUnavailable):
+        return False
+    message = str(error).lower()
+    return (is_rate_limit_error(error)
+            or any(code in message for code in ("500", "502", "503", "504", "unavailable"))
+            or "timeout" in message or "timed out" in message
+            or "connection" in message or "network" in message)
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` calls per second with bursts up to `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Take one token, waiting up to timeout seconds. Returns False if none came free."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Open after `failure_threshold` consecutive failures; after `reset_timeout`
+    seconds let one trial call through (half-open) and close again if it succeeds.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return (self._opened_at is not None
+                    and time.monotonic() - self._opened_at < self.reset_timeout)
+
+    def allow(self):
+        """Return True if a call may go ahead."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """Give back a half-open trial slot that was not used for a real call."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class Upstream:
+    """Rate limit, retry and circuit-break calls to one external service."""
+
+    def __init__(self, name, rate, burst, max_wait=10.0, retries=2, base_delay=0.5,
+                 max_delay=8.0, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_wait = max_wait
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def call(self, fn, retry_rate_limits=True):
+        """
+        Call fn() under this upstream's limits.
+
+        With retry_rate_limits=False, throttling errors are raised at once so
+        the caller can fail over (e.g. to another API key) instead of backing off.
+
+        Raises:
+            UpstreamUnavailable if the circuit is open or no rate-limit token
+            came free within max_wait; otherwise whatever fn raised last
+        """
+        if not self.breaker.allow():
+            increment("upstream_rejected_total", upstream=self.name, reason="circuit_open")
+            raise UpstreamUnavailable(f"{self.name} is temporarily unavailable (circuit open)")
+
+        attempt = 0
+        while True:
+            if not self.bucket.acquire(timeout=self.max_wait):
+                # Local congestion says nothing about upstream health
+                self.breaker.release_trial()
+                increment("upstream_rejected_total", upstream=self.name, reason="rate_limited")
+                raise UpstreamUnavailable(f"{self.name} is busy (rate limit queue full)")
+
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_retryable_error(e):
+                    # The upstream answered; the request itself was rejected
+                    self.breaker.record_success()
+                    raise
+                if attempt >= self.retries or (not retry_rate_limits and is_rate_limit_error(e)):
+                    self.breaker.record_failure()
+                    if self.breaker.is_open:
+                        logger.warning("circuit_open", upstream=self.name, error=str(e)[:80])
+                    raise
+                # Full jitter exponential backoff
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+                logger.info("upstream_retry", upstream=self.name, attempt=attempt + 1,
+                            delay=round(delay, 2), error=str(e)[:80])
+                increment("upstream_retries_total", upstream=self.name)
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self.breaker.record_success()
+            return result
+
+
+GEMINI_RATE = float(os.getenv("LOCALLEARN_GEMINI_RATE", "5"))
+GEMINI_BURST = int(os.getenv("LOCALLEARN_GEMINI_BURST", "10"))
+
+
+def gemini_key_upstream(index):
+    """Upstream for the index-th Gemini API key (each key has its own quota)."""
+    if index == 0:
+        return gemini_upstream
+    return Upstream(f"Gemini key {index + 1}", rate=GEMINI_RATE, burst=GEMINI_BURST, base_delay=1.0)
+
+
+# Shared upstreams used by utils/model_router.py and utils/audio_utils.py
+gemini_upstream = Upstream("Gemini", rate=GEMINI_RATE, burst=GEMINI_BURST, base_delay=1.0)
+gtts_upstream = Upstream(
+    "Google TTS",
+    rate=float(os.getenv("LOCALLEARN_GTTS_RATE", "3")),
+    burst=int(os.getenv("LOCALLEARN_GTTS_BURST", "6")),
+)
@@ -0,0 +1,109 @@
+import os
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from utils.metrics import increment
+
+# Request coalescing: while a call for a key is in flight, identical calls
+# from other sessions wait for it and share its result (or error) instead of
+# each hitting the upstream. Nothing is kept once the call finishes; the
+# explanation and audio caches take over from there.
+#
+# A leader that gives up without an outcome (a streaming reader that went
+# away) publishes ABANDONED instead of an error: its followers join again and
+# one of them becomes the new leader. Followers wait at most WAIT_TIMEOUT
+# seconds for a leader.
+WAIT_TIMEOUT = float(os.getenv("LOCALLEARN_FLIGHT_WAIT_TIMEOUT", "120"))
+
+ABANDONED = object()
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls that share a key."""
+
+    def __init__(self, name, wait_timeout=WAIT_TIMEOUT):
+        self.name = name
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def join(self, key):
+        """
+        Join the in-flight call for key, or become its leader.
+
+        Returns:
+            (future, is_leader). The leader must run the call and pass the
+            outcome to finish() or give up with abandon(); followers call wait().
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                increment("coalesced_requests_total", group=self.name)
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def finish(self, key, future, result=None, error=None):
+        """Publish the leader's outcome to every follower and retire the key."""
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def abandon(self, key, future):
+        """Retire key without an outcome; its followers join again and one of them leads."""
+        increment("coalesced_abandoned_total", group=self.name)
+        self.finish(key, future, result=ABANDONED)
+
+    def wait(self, future):
+        """
+        Wait for the leader's outcome as a follower.
+
+        Returns:
+            The leader's result, or ABANDONED if the leader gave up (join again)
+
+        Raises:
+            The leader's error, or TimeoutError after wait_timeout seconds
+        """
+        try:
+            return future.result(timeout=self.wait_timeout)
+        except FutureTimeoutError:
+            increment("coalesced_wait_timeouts_total", group=self.name)
+            raise TimeoutError(f"Timed out after {self.wait_timeout:.0f}s waiting for an identical "
+                               f"{self.name} request")
+
+    def do(self, key, fn):
+        """Run fn() once for all concurrent callers with the same key and return its result."""
+        while True:
+            future, leader = self.join(key)
+            if leader:
+                break
+            result = self.wait(future)
+            if result is not ABANDONED:
+                return result
+        result = ABANDONED
+        error = None
+        try:
+            result = fn()
+            return result
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if error is not None:
+                self.finish(key, future, error=error)
+            elif result is ABANDONED:
+                # Interrupted by a BaseException (KeyboardInterrupt, Streamlit
+                # stopping the script): let a follower take over
+                self.abandon(key, future)
+            else:
+                self.finish(key, future, result=result)
+
+
+# Shared groups: explanations keyed by their cache key, audio by its content hash
+tutor_flight = SingleFlight("tutor")
+audio_flight = SingleFlight("audio")
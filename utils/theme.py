@@ -0,0 +1,244 @@
+import functools
+import re
+
+# Dark theme styles and static HTML for the Streamlit app. main.py runs top to
+# bottom on every rerun, so the markup lives here and is prepared once per
+# process instead of being rebuilt each time the script runs.
+
+_THEME_CSS = """
+    <style>
+    /* Overall dark theme */
+    .stApp {
+        background-color: #0a0a0a;
+        color: #ffffff;
+    }
+
+    /* Main content area */
+    .main .block-container {
+        background-color: #0a0a0a;
+        color: #ffffff;
+    }
+
+    /* Sidebar styling */
+    .sidebar .sidebar-content {
+        background-color: #1a1a1a;
+        color: #ffffff;
+    }
+
+    /* Input fields */
+    .stTextInput > div > div > input {
+        background-color: #2a2a2a !important;
+        color: #ffffff !important;
+        border: 1px solid #444444 !important;
+    }
+
+    /* Select boxes */
+    .stSelectbox > div > div > div {
+        background-color: #2a2a2a !important;
+        color: #ffffff !important;
+    }
+
+    /* Buttons */
+    .stButton > button {
+        background-color: #667eea !important;
+        color: #ffffff !important;
+        border: none !important;
+    }
+
+    .stButton > button:hover {
+        background-color: #764ba2 !important;
+        color: #ffffff !important;
+    }
+
+    /* Main banner with dark theme gradient */
+    .main-banner {
+        background: linear-gradient(135deg, #2a2a2a 0%, #4a4a4a 100%);
+        padding: 20px;
+        border-radius: 10px;
+        text-align: center;
+        margin-bottom: 30px;
+        box-shadow: 0 4px 6px rgba(0,0,0,0.3);
+        border: 1px solid #555555;
+    }
+    .main-banner h1 {
+        color: #ffffff;
+        margin: 0;
+        font-size: 2.5em;
+        font-weight: bold;
+        text-shadow: 0 2px 4px rgba(0,0,0,0.5);
+    }
+    .main-banner p {
+        color: #cccccc;
+        margin: 5px 0 0 0;
+        font-size: 1.2em;
+    }
+
+    /* Output box for explanations */
+    .output-box {
+        background-color: #1a1a1a;
+        padding: 20px;
+        border-radius: 10px;
+        border-left: 5px solid #667eea;
+        margin-top: 20px;
+        font-size: 1.1em;
+        line-height: 1.6;
+        color: #ffffff !important;
+        white-space: pre-wrap;
+        word-wrap: break-word;
+        border: 1px solid #333333;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.2);
+    }
+
+    /* Slider styling */
+    .stSlider > div > div > div {
+        background-color: #2a2a2a !important;
+    }
+
+    /* Headers and text */
+    h1, h2, h3, h4, h5, h6 {
+        color: #ffffff !important;
+    }
+
+    /* Regular text */
+    p, span, div {
+        color: #cccccc;
+    }
+
+    /* Success messages */
+    .stSuccess {
+        background-color: #1a4a1a !important;
+        color: #90EE90 !important;
+    }
+
+    /* Warning messages */
+    .stWarning {
+        background-color: #4a4a1a !important;
+        color: #FFFFE0 !important;
+    }
+
+    /* Error messages */
+    .stError {
+        background-color: #4a1a1a !important;
+        color: #FFB6C1 !important;
+    }
+
+    /* Info messages */
+    .stInfo {
+        background-color: #1a4a4a !important;
+        color: #87CEEB !important;
+    }
+
+    /* Footer */
+    .footer-text {
+        color: #888888 !important;
+    }
+
+    /* Form labels and other text */
+    label, .stMarkdown, .stText {
+        color: #ffffff !important;
+    }
+
+    /* Radio buttons and checkboxes */
+    .stRadio > div, .stCheckbox > div {
+        color: #ffffff !important;
+    }
+
+    /* Table styling */
+    .dataframe {
+        background-color: #1a1a1a !important;
+        color: #ffffff !important;
+    }
+
+    /* Code blocks */
+    code {
+        background-color: #2a2a2a !important;
+        color: #ffffff !important;
+    }
+
+    /* Links */
+    a {
+        color: #667eea !important;
+    }
+
+    /* Horizontal rules */
+    hr {
+        border-color: #444444 !important;
+    }
+
+    /* Card-like elements */
+    .stCard {
+        background-color: #1a1a1a !important;
+        border: 1px solid #333333 !important;
+        border-radius: 10px !important;
+    }
+
+    /* Metric boxes */
+    .metric-container {
+        background-color: #1a1a1a !important;
+        border: 1px solid #333333 !important;
+        border-radius: 8px !important;
+        padding: 10px !important;
+    }
+
+    /* Audio player */
+    audio {
+        width: 100%;
+        background-color: #1a1a1a;
+        border: 1px solid #444;
+        border-radius: 5px;
+        filter: invert(0.9);
+    }
+    audio::-webkit-media-controls-panel {
+        background-color: #1a1a1a !important;
+    }
+    audio::-webkit-media-controls-current-time-display,
+    audio::-webkit-media-controls-time-remaining-display {
+        color: #ffffff !important;
+    }
+
+    /* Smooth transitions */
+    * {
+        transition: background-color 0.3s ease, color 0.3s ease, border-color 0.3s ease;
+    }
+    </style>
+"""
+
+BANNER_HTML = """
+    <div class="main-banner">
+        <h1>🌍 LocalLearn – Science in Your Language & Style</h1>
+        <p>Learn any topic in your local language with real-life examples</p>
+    </div>
+"""
+
+FOOTER_HTML = """
+    <div style='text-align: center; color: #888888; padding: 20px;' class='footer-text'>
+        <p>💡 <strong>LocalLearn</strong> - Making science accessible in every language</p>
+        <p style='font-size: 0.9em;'>Powered by Google ADK Agent Architecture</p>
+    </div>
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def theme_css():
+    """Return the theme <style> block with comments and extra whitespace removed."""
+    css = re.sub(r"/\*.*?\*/", "", _THEME_CSS, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.strip()
+
+
+def format_explanation_html(text):
+    """Wrap explanation text in the styled output box, keeping line breaks and spacing."""
+    explanation_text = text.replace('\n', '<br>').replace('  ', '&nbsp;&nbsp;')
+    return f'<div class="output-box">{explanation_text}</div>'
+
+
+@functools.lru_cache(maxsize=256)
+def explanation_html(text):
+    """
+    Memoized format_explanation_html for finished explanations.
+
+    Keyed on the text itself: str hashes are cached on the object, so a
+    rerun with the explanation held in session state is a dict lookup.
+    """
+    return format_explanation_html(text)
@@ -0,0 +1,271 @@
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from utils.metrics import get_logger, increment
+
+logger = get_logger("topic_index")
+
+# Topic canonicalization so that "newtons first law", "Newton's 1st law" and
+# "first law of newton" all share one cached answer.
+#
+# 1. canonicalize_topic() folds case, punctuation, possessives/plurals, number
+#    words and ordinals, drops filler words and sorts the remaining words.
+# 2. TopicIndex keeps the canonical forms of previously answered topics per
+#    language in a character trigram index. A new topic that is not an exact
+#    canonical match is mapped to the most similar stored topic if their
+#    trigram Jaccard similarity reaches the threshold (catches typos such as
+#    "photosynthsis"). Numbers must match exactly, so "newton 2 law" never
+#    maps to "newton 1 law" however similar the rest is.
+# 3. A fuzzy match must also pair up word by word: every word equal to or a
+#    small typo of a word in the other topic, and never the same stem with a
+#    different prefix. Trigrams alone rate "asexual reproduction" close to
+#    "sexual reproduction" and "endothermic" close to "exothermic", and
+#    answering one with the other teaches the opposite concept.
+TOPIC_DB_PATH = os.getenv(
+    "LOCALLEARN_TOPIC_DB",
+    os.path.join(os.path.expanduser("~"), ".cache", "locallearn", "topics.sqlite3"),
+)
+TOPIC_SIMILARITY = float(os.getenv("LOCALLEARN_TOPIC_SIMILARITY", "0.65"))
+
+NUMBER_WORDS = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4", "five": "5",
+    "six": "6", "seven": "7", "eight": "8", "nine": "9", "ten": "10",
+    "first": "1", "second": "2", "third": "3", "fourth": "4", "fifth": "5",
+    "sixth": "6", "seventh": "7", "eighth": "8", "ninth": "9", "tenth": "10",
+}
+ORDINAL_RE = re.compile(r"^(\d+)(st|nd|rd|th)$")
+# Prefixes that negate or invert a word ("abiotic", "non renewable", "hypotonic")
+CONTRAST_PREFIXES = (
+    "a", "an", "anti", "de", "dis", "endo", "exo", "hyper", "hypo", "il", "im", "in",
+    "inter", "intra", "ir", "non", "sub", "super", "un",
+)
+FILLER_WORDS = {"a", "an", "the", "of", "in", "on", "and", "what", "is", "are", "about", "explain"}
+
+
+def _fold_word(word):
+    # Native-script digits (e.g. Devanagari) become ASCII digits
+    if word.isdigit():
+        return "".join(str(unicodedata.digit(ch)) for ch in word)
+    if word in NUMBER_WORDS:
+        return NUMBER_WORDS[word]
+    match = ORDINAL_RE.match(word)
+    if match:
+        return match.group(1)
+    # Plurals and possessives ("newtons", "newton's" after apostrophe removal)
+    if len(word) > 3 and word.isascii() and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def canonicalize_topic(topic):
+    """Fold a topic into its canonical key form."""
+    text = unicodedata.normalize("NFKC", topic or "").casefold()
+    text = re.sub(r"['’`]", "", text)
+    # Keep letters, digits and combining marks (needed for Indic scripts)
+    text = "".join(ch if ch.isalnum() or unicodedata.category(ch).startswith("M") else " "
+                   for ch in text)
+    words = [_fold_word(word) for word in text.split()]
+    kept = [word for word in words if word not in FILLER_WORDS]
+    return " ".join(sorted(kept or words))
+
+
+def _numbers(canonical):
+    return {word for word in canonical.split() if word.isdigit()}
+
+
+def _trigrams(text):
+    padded = f" {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _edit_distance(a, b, limit):
+    """Levenshtein distance of a and b, or limit + 1 once it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ch in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ch != other)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _contrast(a, b):
+    """True if a and b are one stem with different prefixes ("sexual"/"asexual", "hypo-"/"hypertonic")."""
+    stems_a = {a} | {a[len(p):] for p in CONTRAST_PREFIXES if a.startswith(p)}
+    stems_b = {b} | {b[len(p):] for p in CONTRAST_PREFIXES if b.startswith(p)}
+    return bool(stems_a & stems_b)
+
+
+def _typo(a, b):
+    """True if word b may be a as typed with a typo."""
+    if a == b:
+        return True
+    if a.isdigit() or b.isdigit() or _contrast(a, b):
+        return False
+    limit = 1 if min(len(a), len(b)) <= 6 else 2
+    return _edit_distance(a, b, limit) <= limit
+
+
+def _words_match(canonical, candidate):
+    """True if every word of canonical pairs with an equal or mistyped word of candidate."""
+    words, others = canonical.split(), candidate.split()
+    if len(words) != len(others):
+        return False
+    unmatched = list(others)
+    # Exact pairs first, so a typo never takes another word's exact partner
+    remaining = []
+    for word in words:
+        if word in unmatched:
+            unmatched.remove(word)
+        else:
+            remaining.append(word)
+    for word in remaining:
+        other = next((other for other in unmatched if _typo(word, other)), None)
+        if other is None:
+            return False
+        unmatched.remove(other)
+    return True
+
+
+class TopicIndex:
+    """Per-language trigram index over canonical topics with SQLite persistence."""
+
+    def __init__(self, db_path=TOPIC_DB_PATH, threshold=TOPIC_SIMILARITY):
+        self.db_path = db_path
+        self.threshold = threshold
+        self._languages = {}  # language -> {"grams": {canonical: grams}, "postings": {gram: set}}
+        self._lock = threading.Lock()
+        self._conn = None
+        self._loaded = False
+
+    def _db(self):
+        if self._conn is None and self.db_path:
+            try:
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+                conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS topics ("
+                    " language TEXT NOT NULL,"
+                    " canonical TEXT NOT NULL,"
+                    " created_at REAL NOT NULL,"
+                    " PRIMARY KEY (language, canonical))"
+                )
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error as e:
+                logger.warning("topic_index_persistence_disabled", error=str(e))
+                self.db_path = None
+        return self._conn
+
+    def _load(self):
+        """Load stored topics into memory on first use."""
+        if self._loaded:
+            return
+        self._loaded = True
+        conn = self._db()
+        if conn is None:
+            return
+        try:
+            for language, canonical in conn.execute("SELECT language, canonical FROM topics"):
+                self._insert(language, canonical)
+        except sqlite3.Error as e:
+            logger.warning("topic_index_load_failed", error=str(e))
+
+    def _insert(self, language, canonical):
+        index = self._languages.setdefault(language, {"grams": {}, "postings": {}})
+        if canonical in index["grams"]:
+            return False
+        grams = _trigrams(canonical)
+        index["grams"][canonical] = grams
+        for gram in grams:
+            index["postings"].setdefault(gram, set()).add(canonical)
+        return True
+
+    def add(self, canonical, language):
+        """Record the canonical key of an answered topic so near-duplicates can map to it."""
+        if not canonical:
+            return
+        with self._lock:
+            self._load()
+            if not self._insert(language, canonical):
+                return
+            conn = self._db()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR IGNORE INTO topics (language, canonical, created_at) VALUES (?, ?, ?)",
+                    (language, canonical, time.time()),
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("topic_index_write_failed", error=str(e))
+
+    def lookup(self, topic, language):
+        """
+        Find the stored canonical topic most similar to topic.
+
+        Returns:
+            (canonical, similarity) of the best match at or above the threshold,
+            or (None, 0.0) if nothing is similar enough
+        """
+        canonical = canonicalize_topic(topic)
+        with self._lock:
+            self._load()
+            index = self._languages.get(language)
+            if not index or not canonical:
+                return None, 0.0
+            if canonical in index["grams"]:
+                return canonical, 1.0
+
+            grams = _trigrams(canonical)
+            postings = index["postings"]
+            # Prefix filter: a topic with Jaccard >= t must share at least one
+            # of any (|A| - ceil(t*|A|) + 1) query grams, so only the rarest
+            # grams' postings need scanning to collect every candidate
+            prefix_len = len(grams) - math.ceil(self.threshold * len(grams)) + 1
+            rarest = sorted(grams, key=lambda gram: len(postings.get(gram, ())))[:prefix_len]
+            candidates = set()
+            for gram in rarest:
+                candidates.update(postings.get(gram, ()))
+
+            numbers = _numbers(canonical)
+            best, best_score = None, 0.0
+            min_size = self.threshold * len(grams)
+            max_size = len(grams) / self.threshold
+            for candidate in candidates:
+                candidate_grams = index["grams"][candidate]
+                if not min_size <= len(candidate_grams) <= max_size:
+                    continue
+                if _numbers(candidate) != numbers:
+                    continue
+                shared = len(grams & candidate_grams)
+                score = shared / (len(grams) + len(candidate_grams) - shared)
+                if score > best_score and _words_match(canonical, candidate):
+                    best, best_score = candidate, score
+            if best_score >= self.threshold:
+                return best, best_score
+            return None, 0.0
+
+    def resolve(self, topic, language):
+        """Return the canonical key to cache topic under: a near-duplicate's, or its own."""
+        match, score = self.lookup(topic, language)
+        if match is None:
+            result = "new"
+        else:
+            result = "exact" if score == 1.0 else "fuzzy"
+        increment("topic_index_total", result=result)
+        return match or canonicalize_topic(topic) or topic
+
+
+# Shared index used by agents/tutor_agent.py
+topic_index = TopicIndex()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Re-warm the explanation and audio caches with the most requested topics.
+
+Reads the access log (LOCALLEARN_ACCESS_LOG), takes the hottest topics per
+language and makes sure their explanations and audio are in the on-disk
+caches, so the first students of the day get instant answers:
+
+    python warm_cache.py --top 20              # once, e.g. from cron
+    python warm_cache.py --top 20 --at 07:30   # every day at 07:30
+
+Answers that are still cached cost nothing; only expired or evicted ones
+are generated again. Follow-ups ("Make Even Simpler", "Another Example") are
+warmed as a follow-up on the topic's cached explanation, which is the
+conversation a session has when it asks for them. Warming requests are not
+written to the access log.
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from agents.tutor_agent import ask_follow_up, ask_tutor_batch, start_conversation
+from utils.access_log import access_log
+from utils.audio_utils import prepare_tts_text, speak_text
+
+
+def hot_items(top, days):
+    """The top most requested (topic, language, simplify, follow_up) per language in the last days."""
+    access_log.load(since=time.time() - days * 24 * 3600)
+    return [(topic, language, simplify, follow_up)
+            for topic, language, simplify, follow_up, count in access_log.hottest(n=top)]
+
+
+def warm(top=20, days=7, with_audio=True, max_concurrency=8, audio_concurrency=2):
+    items = hot_items(top, days)
+    if not items:
+        print("ℹ️ The access log has no requests to warm from")
+        return 0
+
+    # Follow-ups continue the topic's detailed explanation, so warm that too
+    explanations = list(dict.fromkeys(
+        (topic, language, False if follow_up else simplify) for topic, language, simplify, follow_up in items))
+    follow_ups = [(topic, language, follow_up) for topic, language, simplify, follow_up in items if follow_up]
+    print(f"🔥 Warming {len(explanations)} explanations and {len(follow_ups)} follow-ups...")
+    results = dict(zip(explanations, ask_tutor_batch(explanations, max_concurrency=max_concurrency)))
+
+    failures = 0
+    warmed = 0
+    answers = []  # (answer, language) to synthesize
+    for (topic, language, simplify), (explanation, error) in results.items():
+        if error is not None:
+            failures += 1
+            print(f"❌ {topic} [{language}, {'simple' if simplify else 'detailed'}]: {error}")
+            continue
+        warmed += 1
+        answers.append((explanation, language))
+
+    def follow_up(job):
+        topic, language, kind = job
+        explanation, error = results[(topic, language, False)]
+        if error is not None:
+            return None, error
+        try:
+            return ask_follow_up(start_conversation(topic, explanation), language, kind), None
+        except Exception as e:
+            return None, e
+
+    if follow_ups:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(follow_ups)))) as pool:
+            for (topic, language, kind), (answer, error) in zip(follow_ups, pool.map(follow_up, follow_ups)):
+                if error is not None:
+                    failures += 1
+                    print(f"❌ {topic} [{language}, {kind}]: {error}")
+                    continue
+                warmed += 1
+                answers.append((answer, language))
+
+    audio_jobs = [(prepare_tts_text(answer), language) for answer, language in answers] if with_audio else []
+
+    clips = 0
+    if audio_jobs:
+        print(f"🔊 Warming {len(audio_jobs)} audio clips...")
+        with ThreadPoolExecutor(max_workers=audio_concurrency) as pool:
+            for (text, language), (audio_bytes, audio_file) in zip(
+                    audio_jobs, pool.map(lambda job: speak_text(*job), audio_jobs)):
+                if audio_bytes:
+                    clips += 1
+                else:
+                    failures += 1
+                    print(f"❌ Audio failed [{language}]: {text[:40]}...")
+
+    print(f"✅ Warmed {warmed} explanations and follow-ups and {clips} audio clips, {failures} failures")
+    return failures
+
+
+def seconds_until(at):
+    """Seconds from now until the next HH:MM local time."""
+    hour, minute = (int(part) for part in at.split(":"))
+    now = datetime.now()
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-warm LocalLearn caches from the access log.")
+    parser.add_argument("--top", type=int, default=20, help="Topics to warm per language")
+    parser.add_argument("--days", type=float, default=7, help="Only count requests from the last N days")
+    parser.add_argument("--at", metavar="HH:MM", help="Keep running and warm every day at this local time")
+    parser.add_argument("--no-audio", action="store_true", help="Skip audio synthesis")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel generation requests")
+    parser.add_argument("--audio-concurrency", type=int, default=2, help="Parallel TTS requests")
+    args = parser.parse_args()
+
+    load_dotenv()
+    # Warming is not student traffic
+    access_log.enabled = False
+
+    def run():
+        return warm(args.top, args.days, with_audio=not args.no_audio,
+                    max_concurrency=args.concurrency, audio_concurrency=args.audio_concurrency)
+
+    if not args.at:
+        return 1 if run() else 0
+    while True:
+        delay = seconds_until(args.at)
+        print(f"⏰ Next warm-up at {args.at} (in {delay / 3600:.1f} h)")
+        time.sleep(delay)
+        run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())